@@ -4,24 +4,30 @@ import streamlit as st
 import requests
 import pandas as pd
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import jamai_client
+import table_cache
+import task_mirror
+import task_import
+import motivation_index
+import metrics
 
 # Load environment variables
 load_dotenv()
 
+# Serve the Prometheus scrape endpoint from the app process, if configured
+metrics.start_server()
+
 # Environment Variables
-JAMAI_PAT = os.getenv("JAMAI_PAT")
-PROJECT_ID = os.getenv("PROJECT_ID")
-BASE_URL = os.getenv("BASE_URL")
 TASK_TABLE_ID = os.getenv("TASK_TABLE_ID")
 PRODUCTIVITY_TIPS_TABLE_ID = os.getenv("PRODUCTIVITY_TIPS_TABLE_ID")
+TIPS_CACHE_TTL = float(os.getenv("TIPS_CACHE_TTL", "600"))
 
-# API Headers
-headers = {
-    "Authorization": f"Bearer {JAMAI_PAT}",
-    "X-PROJECT-ID": PROJECT_ID,
-    "Content-Type": "application/json",
-    "Accept": "application/json"
-}
+# Seconds the page waits for its reads before rendering without them; the reads themselves give up at the same deadline
+HOME_LOAD_TIMEOUT = float(os.getenv("HOME_LOAD_TIMEOUT", "10"))
+# Loader threads (HOME_LOADER_THREADS or HOME_CONCURRENT_SESSIONS x 3), sized in jamai_client so its connection pool matches
+HOME_LOADER_THREADS = jamai_client.LOADER_THREADS
 
 # Reserved meal times
 MEAL_DETAILS = {
@@ -30,74 +36,89 @@ MEAL_DETAILS = {
     "Dinner": {"time": "19:00-20:00", "priority": "Meal"}
 }
 
-# Function to fetch tasks from JamAI
-def fetch_tasks_from_table():
-    url = f"{BASE_URL}/api/v1/gen_tables/action/{TASK_TABLE_ID}/rows"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        rows = response.json().get("items", [])
-        if rows:
-            tasks = [
-                {
-                    "task_name": row["task_name"]["value"],
-                    "priority": row["priority"]["value"],
-                    "estimated_time": row["estimated_time"]["value"],
-                    "task_date": row["task_date"]["value"]
-                }
-                for row in rows
-            ]
-            return tasks
-        else:
-            return []
+# Function to convert a JamAI row into a task
+def task_from_row(row):
+    return {
+        "task_name": row["task_name"]["value"],
+        "priority": row["priority"]["value"],
+        "estimated_time": row["estimated_time"]["value"],
+        "task_date": row["task_date"]["value"]
+    }
+
+# Function to fetch tasks from JamAI (raises requests exceptions, so it is safe to run off the script thread)
+@metrics.timed("fetch_tasks_from_table")
+def fetch_tasks_from_table(task_date=None, priority=None, deadline=None):
+    filters = {"task_date": task_date, "priority": priority}
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    if mirror is not None:
+        rows = mirror.rows(task_date, priority)
     else:
-        st.error(f"Failed to fetch tasks. Error {response.status_code}: {response.text}")
-        return []
+        rows = table_cache.get_or_load(
+            TASK_TABLE_ID, ("rows", task_date, priority),
+            lambda: list(jamai_client.iter_matching_rows("action", TASK_TABLE_ID, filters, deadline=deadline))
+        )
+    return [task_from_row(row) for row in rows]
 
 # Function to fetch tasks for today
-def fetch_tasks_for_today():
+def fetch_tasks_for_today(deadline=None):
     today_date = datetime.date.today().strftime("%Y-%m-%d")
-    tasks = fetch_tasks_from_table()
-    return [task for task in tasks if task.get("task_date") == today_date]
-
-# Function to fetch motivation from the productivity_tips action table
-def fetch_motivation_from_table(task_count):
-    url = f"{BASE_URL}/api/v1/gen_tables/action/{PRODUCTIVITY_TIPS_TABLE_ID}/rows"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        rows = response.json().get("items", [])
-        if not rows:
-            return "No motivational tips available in the database."
-
-        for row in rows:
-            table_task_count = row.get("task_count", {}).get("value", "").strip()
-            if table_task_count == str(task_count) or (
-                "-" in table_task_count and eval(f"{task_count} in range({table_task_count.replace('-', ',')})")
-            ):
-                return row.get("motivation", {}).get("value", "Motivational text not found.")
-        return "No matching motivational tip found."
-    else:
-        st.error(f"Failed to fetch motivational tips. Error {response.status_code}: {response.text}")
+    return fetch_tasks_from_table(task_date=today_date, deadline=deadline)
+
+# Function to fetch the compiled productivity_tips index
+@metrics.timed("fetch_tip_index")
+def fetch_tip_index(deadline=None):
+    return table_cache.get_or_load(
+        PRODUCTIVITY_TIPS_TABLE_ID, "index",
+        lambda: motivation_index.compile_tips(
+            jamai_client.iter_rows("action", PRODUCTIVITY_TIPS_TABLE_ID, deadline=deadline)
+        ),
+        ttl=TIPS_CACHE_TTL
+    )
+
+# Function to pick the motivation for a task count from the productivity_tips index
+@metrics.timed("fetch_motivation_from_table")
+def fetch_motivation_from_table(task_count, tip_index):
+    if tip_index is None:
         return "Error fetching motivational tips."
 
-# Function to add a task to JamAI
-def add_task_to_table(task_name, priority, estimated_time, task_date):
-    url = f"{BASE_URL}/api/v1/gen_tables/action/rows/add"
-    payload = {
-        "data": [
-            {
-                "task_name": task_name,
-                "priority": priority,
-                "estimated_time": estimated_time,
-                "task_date": str(task_date)
-            }
-        ],
-        "table_id": TASK_TABLE_ID
-    }
-    response = requests.post(url, json=payload, headers=headers)
-    if response.status_code == 200:
-        st.success(f"Task '{task_name}' added successfully!")
-    else:
-        st.error(f"Failed to add task. Error {response.status_code}: {response.text}")
+    if tip_index.rejected:
+        st.warning("Ignored malformed task_count values in the tips table: "
+                   + ", ".join(f"'{value}'" for value, _ in tip_index.rejected))
+    if not tip_index.row_count:
+        return "No motivational tips available in the database."
+
+    tip = tip_index.lookup(task_count)
+    return tip if tip is not None else "No matching motivational tip found."
+
+# Function to add several tasks to JamAI in one request per chunk
+@metrics.timed("add_tasks_to_table")
+def add_tasks_to_table(task_rows):
+    """
+    Add task rows in bulk. Returns one (row, error) pair per row, error being None on success.
+    """
+    rows = [dict(row, task_date=str(row["task_date"])) for row in task_rows]
+    results = jamai_client.add_rows("action", TASK_TABLE_ID, rows)
+    table_cache.invalidate(TASK_TABLE_ID)
+    # The new rows reach the mirror from a background sync; only Refresh on My Schedule waits for one
+    task_mirror.sync_soon(TASK_TABLE_ID)
+    return results
+
+# Shared thread pool for the page's background reads
+@st.cache_resource
+def get_loader_pool():
+    return ThreadPoolExecutor(max_workers=HOME_LOADER_THREADS, thread_name_prefix="home-loader")
+
+# Function to wait for a background read, falling back if it fails or misses the deadline
+def wait_for(future, deadline, fallback, label):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        st.warning(f"Loading {label} is taking too long, so it is left out for now. Reload the page to try again.")
+    except requests.HTTPError as err:
+        st.error(f"Failed to fetch {label}. Error {err.response.status_code}: {err.response.text}")
+    except requests.RequestException as err:
+        st.error(f"Failed to fetch {label}. {err}")
+    return fallback
 
 # Set up page configuration
 st.set_page_config(page_title="Productivity Manager", page_icon="📋", layout="wide")
@@ -131,8 +152,17 @@ st.markdown(
 )
 
 
+# Dispatch the page's independent reads together so the render waits on the slowest, not the sum.
+# The reads share the page's deadline, so one the page stops waiting for frees its thread soon after.
+loader_pool = get_loader_pool()
+load_deadline = time.monotonic() + HOME_LOAD_TIMEOUT
+tasks_future = loader_pool.submit(fetch_tasks_from_table, deadline=load_deadline)
+tasks_today_future = loader_pool.submit(fetch_tasks_for_today, load_deadline)
+tip_index_future = loader_pool.submit(fetch_tip_index, load_deadline)
+
 # Fetch existing tasks
-tasks = fetch_tasks_from_table()
+tasks = wait_for(tasks_future, load_deadline, [], "tasks")
+tasks_added = False
 
 # Task Submission Section
 st.subheader("Add a New Task")
@@ -156,22 +186,55 @@ with st.form(key="add_task_form"):
     submit_task = st.form_submit_button("Add Task")
 
     if submit_task:
-        if task_name or include_breakfast or include_lunch or include_dinner:
-            if task_name:
-                add_task_to_table(task_name, priority, estimated_time, task_date)
-            if include_breakfast:
-                add_task_to_table("Breakfast", MEAL_DETAILS["Breakfast"]["priority"], 1, task_date)
-            if include_lunch:
-                add_task_to_table("Lunch", MEAL_DETAILS["Lunch"]["priority"], 1, task_date)
-            if include_dinner:
-                add_task_to_table("Dinner", MEAL_DETAILS["Dinner"]["priority"], 1, task_date)
-            st.success("All selected tasks and meals added successfully!")
+        # Collect the task and selected meals so they are added in a single request
+        new_rows = []
+        if task_name:
+            new_rows.append({"task_name": task_name, "priority": priority,
+                             "estimated_time": estimated_time, "task_date": task_date})
+        for meal, included in (("Breakfast", include_breakfast), ("Lunch", include_lunch), ("Dinner", include_dinner)):
+            if included:
+                new_rows.append({"task_name": meal, "priority": MEAL_DETAILS[meal]["priority"],
+                                 "estimated_time": 1, "task_date": task_date})
+
+        if new_rows:
+            results = add_tasks_to_table(new_rows)
+            tasks_added = True
+            for row, error in results:
+                if error is None:
+                    st.success(f"Task '{row['task_name']}' added successfully!")
+                else:
+                    st.error(f"Failed to add task '{row['task_name']}'. {error}")
+            if all(error is None for _, error in results):
+                st.success("All selected tasks and meals added successfully!")
         else:
             st.warning("Please provide a task name or select at least one meal.")
 
-
-# Fetch tasks for today to calculate the count
-tasks_today = fetch_tasks_for_today()
+# Bulk Import Section
+with st.expander("📤 Import Tasks from CSV/JSON"):
+    st.caption("Columns: task_name, priority (High/Medium/Low/Meal), estimated_time (hours), task_date (YYYY-MM-DD).")
+    uploaded_file = st.file_uploader("Task File", type=["csv", "json", "jsonl"])
+    if uploaded_file is not None and st.button("Import Tasks"):
+        import_rows, import_errors = task_import.parse_task_file(uploaded_file.name, uploaded_file.getvalue())
+        failures = [{"line": line, "task_name": "", "error": message} for line, message in import_errors]
+        if import_rows:
+            results = add_tasks_to_table(import_rows)
+            tasks_added = True
+            failures += [
+                {"line": None, "task_name": row["task_name"], "error": error}
+                for row, error in results if error is not None
+            ]
+            added_count = sum(1 for _, error in results if error is None)
+            st.success(f"Imported {added_count} of {len(import_rows) + len(import_errors)} tasks.")
+        if failures:
+            st.error(f"{len(failures)} tasks were not imported.")
+            st.dataframe(pd.DataFrame(failures), use_container_width=True)
+
+
+# Fetch tasks for today to calculate the count, again if this run just added some
+if tasks_added:
+    load_deadline = time.monotonic() + HOME_LOAD_TIMEOUT
+    tasks_today_future = loader_pool.submit(fetch_tasks_for_today, load_deadline)
+tasks_today = wait_for(tasks_today_future, load_deadline, [], "today's tasks")
 # Exclude meals from the task count
 tasks_today_non_meals = [
     task for task in tasks_today if task["priority"] != "Meal"
@@ -180,5 +243,6 @@ tasks_today_count = len(tasks_today_non_meals)
 
 # Display Motivation of the Day
 st.subheader("Motivation of the Day")
-motivation_of_the_day = fetch_motivation_from_table(tasks_today_count)
+tip_index = wait_for(tip_index_future, load_deadline, None, "motivational tips")
+motivation_of_the_day = fetch_motivation_from_table(tasks_today_count, tip_index)
 st.write(f"💡 {motivation_of_the_day}")
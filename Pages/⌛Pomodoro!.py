@@ -1,20 +1,17 @@
+import os
 import streamlit as st
-import time
-from plyer import notification
+import pomodoro_timer
+import notifier
+
+# Notification backends, comma separated: plyer, toast (in the browser), webhook, noop
+POMODORO_NOTIFIERS = [name.strip() for name in os.getenv("POMODORO_NOTIFIERS", "plyer,toast").split(",") if name.strip()]
+POMODORO_WEBHOOK_URL = os.getenv("POMODORO_WEBHOOK_URL")
+# Longest a single backend may take to deliver before it is counted as timed out
+NOTIFY_TIMEOUT = float(os.getenv("POMODORO_NOTIFY_TIMEOUT", "5"))
 
 # Set up page configuration
 st.set_page_config(page_title="⌛ Pomodoro Timer", page_icon="⏱️", layout="centered")
 
-# Initialize session state variables
-if "timer_mode" not in st.session_state:
-    st.session_state.timer_mode = "Work"  # Modes: Work, Short Break, Long Break
-if "cycle_count" not in st.session_state:
-    st.session_state.cycle_count = 0
-if "time_left" not in st.session_state:
-    st.session_state.time_left = 0  # Initial time left
-if "running" not in st.session_state:
-    st.session_state.running = False  # Is the timer running?
-
 # Sidebar settings
 st.sidebar.title("Pomodoro Settings")
 work_duration = st.sidebar.number_input("Work Duration (minutes)", min_value=1, value=25)
@@ -22,103 +19,81 @@ short_break_duration = st.sidebar.number_input("Short Break Duration (minutes)",
 long_break_duration = st.sidebar.number_input("Long Break Duration (minutes)", min_value=1, value=15)
 cycles = st.sidebar.number_input("Number of Work Cycles Before Long Break", min_value=1, value=4)
 
+# Initialize the timer in session state; it only stores a deadline, so no thread runs between refreshes
+if "pomodoro" not in st.session_state:
+    st.session_state.pomodoro = pomodoro_timer.PomodoroTimer(
+        work_duration * 60, short_break_duration * 60, long_break_duration * 60, cycles
+    )
+timer = st.session_state.pomodoro
+timer.configure(work_duration * 60, short_break_duration * 60, long_break_duration * 60, cycles)
+
 # Sidebar control buttons
 if st.sidebar.button("Start Timer"):
-    if not st.session_state.running:
-        st.session_state.running = True
-        if st.session_state.time_left == 0:
-            st.session_state.timer_mode = "Work"
-            st.session_state.time_left = work_duration * 60
+    timer.start()
 
 if st.sidebar.button("Pause Timer"):
-    st.session_state.running = False
+    timer.pause()
 
 if st.sidebar.button("Reset Timer"):
-    st.session_state.running = False
-    st.session_state.timer_mode = "Work"
-    st.session_state.cycle_count = 0
-    st.session_state.time_left = work_duration * 60
+    timer.reset()
 
-# Function for desktop notifications
-def send_notification(title, message):
-    notification.notify(
-        title=title,
-        message=message,
-        app_name="Pomodoro Timer",
-        timeout=5  # Notification duration in seconds
-    )
+# Shared notification dispatcher; delivery happens on its worker thread, never in the timer tick
+@st.cache_resource
+def get_notifier():
+    return notifier.Notifier(notifier.create_backends(POMODORO_NOTIFIERS, POMODORO_WEBHOOK_URL), timeout=NOTIFY_TIMEOUT)
 
-# Timer update logic
-def update_timer():
-    while st.session_state.time_left > 0 and st.session_state.running:
-        mins, secs = divmod(st.session_state.time_left, 60)
-        ph.metric(f"{st.session_state.timer_mode} Time Remaining", f"{mins:02d}:{secs:02d}")
-        progress_bar.progress(calculate_progress())
-        time.sleep(1)
-        st.session_state.time_left -= 1
-
-    # Transition to the next phase
-    if st.session_state.time_left == 0 and st.session_state.running:
-        if st.session_state.timer_mode == "Work":
-            st.session_state.cycle_count += 1
-            st.success("Work session complete! Time for a break.")
-            send_notification("Pomodoro Timer", "Work session complete! Time for a break.")
-            if st.session_state.cycle_count % cycles == 0:
-                st.session_state.timer_mode = "Long Break"
-                st.session_state.time_left = long_break_duration * 60
-                st.success("Starting Long Break!")
-                send_notification("Pomodoro Timer", "Starting Long Break!")
-            elif st.session_state.cycle_count < cycles:
-                st.session_state.timer_mode = "Short Break"
-                st.session_state.time_left = short_break_duration * 60
-                st.success("Starting Short Break!")
-                send_notification("Pomodoro Timer", "Starting Short Break!")
-            else:
-                st.session_state.running = False  # End after the last work cycle
-                st.session_state.timer_mode = "Completed"
-                st.balloons()
-                st.success("Pomodoro session complete! Great job!")
-                send_notification("Pomodoro Timer", "Pomodoro session complete! Great job!")
-        elif st.session_state.timer_mode in ["Short Break", "Long Break"]:
-            st.session_state.timer_mode = "Work"
-            st.session_state.time_left = work_duration * 60
-            st.success("Break over! Back to work.")
-            send_notification("Pomodoro Timer", "Break over! Back to work.")
-
-# Progress bar calculation
-def calculate_progress():
-    total_time = 0
-    if st.session_state.timer_mode == "Work":
-        total_time = work_duration * 60
-    elif st.session_state.timer_mode == "Short Break":
-        total_time = short_break_duration * 60
-    elif st.session_state.timer_mode == "Long Break":
-        total_time = long_break_duration * 60
-    return (total_time - st.session_state.time_left) / total_time
+
+# Function for notifications: queued for the background backends, plus a browser toast if enabled
+def send_notification(title, message):
+    if "toast" in POMODORO_NOTIFIERS:
+        st.toast(f"**{title}:** {message}")
+    get_notifier().notify(title, message)
 
 # Main display
 st.title("⏱️ Pomodoro Timer")
 st.markdown("Enhance focus and productivity using the Pomodoro technique!")
 
-# Timer display and progress
-ph = st.empty()
-progress_bar = st.progress(0)
-
-# Timer and control logic
-if st.session_state.running:
-    update_timer()
-
-# Display current state
-st.markdown("---")
-st.subheader("Pomodoro Progress")
-st.write(f"**Current Cycle:** {st.session_state.cycle_count}")
-st.write(f"**Current Mode:** {st.session_state.timer_mode}")
-
-# Show timer progress
-if st.session_state.time_left > 0:
-    mins, secs = divmod(st.session_state.time_left, 60)
-    ph.metric(f"{st.session_state.timer_mode} Time Remaining", f"{mins:02d}:{secs:02d}")
-    progress_bar.progress(calculate_progress())
-else:
-    ph.metric("Timer", "00:00")
-    progress_bar.progress(0)
+
+# Timer display, refreshed once a second while running without blocking the script thread
+@st.fragment(run_every=1 if timer.running else None)
+def timer_panel():
+    messages = timer.advance()
+    for message in messages:
+        send_notification("Pomodoro Timer", message)
+    if messages and not timer.running:
+        # The session just finished: rerun the whole page so this fragment stops refreshing
+        st.session_state.pomodoro_finished = messages
+        st.rerun()
+
+    finished = st.session_state.pop("pomodoro_finished", [])
+    for message in finished + messages:
+        st.success(message)
+    if finished and timer.mode == pomodoro_timer.COMPLETED:
+        st.balloons()
+
+    # Timer display and progress
+    if timer.time_left() > 0:
+        st.metric(f"{timer.mode} Time Remaining", timer.display_time())
+        st.progress(timer.progress())
+    else:
+        st.metric("Timer", "00:00")
+        st.progress(0)
+
+    # Display current state
+    st.markdown("---")
+    st.subheader("Pomodoro Progress")
+    st.write(f"**Current Cycle:** {timer.cycle_count}")
+    st.write(f"**Current Mode:** {timer.mode}")
+
+
+timer_panel()
+
+# Notification delivery health
+notify_stats = get_notifier().stats()
+if notify_stats["failed"] or notify_stats["timed_out"] or notify_stats["dropped"]:
+    st.sidebar.caption(
+        f"Notifications: {notify_stats['delivered']} delivered, {notify_stats['failed']} failed, "
+        f"{notify_stats['timed_out']} timed out, {notify_stats['dropped']} dropped"
+    )
+    if notify_stats["last_error"]:
+        st.sidebar.caption(f"Last notification error: {notify_stats['last_error']}")
@@ -1,9 +1,14 @@
 import os
 from dotenv import load_dotenv
 import streamlit as st
-import pandas as pd
 from scheduler import add_and_schedule_tasks
 import requests
+import jamai_client
+import table_cache
+import task_mirror
+import schedule_index
+import schedule_export
+import metrics
 from st_aggrid import AgGrid, GridOptionsBuilder
 import datetime
 
@@ -11,61 +16,100 @@ import datetime
 load_dotenv()
 
 # Environment Variables
-JAMAI_PAT = os.getenv("JAMAI_PAT")
-PROJECT_ID = os.getenv("PROJECT_ID")
-BASE_URL = os.getenv("BASE_URL")
 TASK_TABLE_ID = os.getenv("TASK_TABLE_ID")
 
-
-# API Headers
-headers = {
-    "Authorization": f"Bearer {JAMAI_PAT}",
-    "X-PROJECT-ID": PROJECT_ID,
-    "Content-Type": "application/json",
-    "Accept": "application/json"
-}
+# Function to convert a JamAI row into a task
+def task_from_row(row):
+    """Map a raw JamAI row to a task dict."""
+    return {
+        "id": row["ID"],
+        "task_name": row["task_name"]["value"],
+        "priority": row["priority"]["value"],
+        "estimated_time": row["estimated_time"]["value"],
+        "scheduled_time": row.get("scheduled_time", {}).get("value", "Not Scheduled"),
+        "task_date": row["task_date"]["value"]
+    }
 
 # Function to fetch tasks from JamAI
-def fetch_tasks_from_table():
+@metrics.timed("fetch_tasks_from_table")
+def fetch_tasks_from_table(task_date=None, priority=None):
     """Fetch tasks from JamAI."""
-    url = f"{BASE_URL}/api/v1/gen_tables/action/{TASK_TABLE_ID}/rows"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        rows = response.json().get("items", [])
-        if rows:
-            tasks = [
-                {
-                    "id": row["ID"],
-                    "task_name": row["task_name"]["value"],
-                    "priority": row["priority"]["value"],
-                    "estimated_time": row["estimated_time"]["value"],
-                    "scheduled_time": row.get("scheduled_time", {}).get("value", "Not Scheduled"),
-                    "task_date": row["task_date"]["value"]
-                }
-                for row in rows
-            ]
-            return tasks
+    filters = {"task_date": task_date, "priority": priority}
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    try:
+        if mirror is not None:
+            rows = mirror.rows(task_date, priority)
         else:
-            return []
-    else:
-        st.error(f"Failed to fetch tasks. Error {response.status_code}: {response.text}")
+            rows = table_cache.get_or_load(
+                TASK_TABLE_ID, ("rows", task_date, priority),
+                lambda: list(jamai_client.iter_matching_rows("action", TASK_TABLE_ID, filters))
+            )
+    except requests.HTTPError as err:
+        st.error(f"Failed to fetch tasks. Error {err.response.status_code}: {err.response.text}")
         return []
+    return [task_from_row(row) for row in rows]
 
 # Function to delete tasks by ID
+@metrics.timed("delete_tasks_by_ids")
 def delete_tasks_by_ids(task_ids):
     """Delete tasks by their IDs."""
-    url = f"{BASE_URL}/api/v1/gen_tables/action/rows/delete"
     payload = {"table_id": TASK_TABLE_ID, "row_ids": task_ids}
-    response = requests.post(url, json=payload, headers=headers)
+    response = jamai_client.post("gen_tables/action/rows/delete", json=payload)
+    table_cache.invalidate(TASK_TABLE_ID)
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    if mirror is not None and response.status_code == 200:
+        mirror.delete_rows(task_ids)
     return response.status_code, response.text
 
-# Initialize session state for tasks
-if "fetched_tasks" not in st.session_state:
-    st.session_state.fetched_tasks = fetch_tasks_from_table()
+# Function to delete many tasks in chunks with a progress bar
+@metrics.timed("delete_tasks_in_bulk")
+def delete_tasks_in_bulk(task_ids):
+    """Delete tasks concurrently in chunks and report partial success."""
+    progress_bar = st.progress(0.0, text="Deleting tasks...")
+
+    def show_progress(done, total):
+        progress_bar.progress(done / total, text=f"Deleted {done} of {total} tasks...")
+
+    deleted_ids, failures = jamai_client.delete_rows(
+        "action", TASK_TABLE_ID, task_ids, on_progress=show_progress
+    )
+    table_cache.invalidate(TASK_TABLE_ID)
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    if mirror is not None:
+        mirror.delete_rows(deleted_ids)
+    progress_bar.empty()
+    for chunk, error in failures:
+        st.error(f"Failed to delete {len(chunk)} tasks. {error}")
+    return deleted_ids, failures
+
+def load_tasks():
+    """Fetch tasks and index them by date once per fetch."""
+    st.session_state.task_index = schedule_index.ScheduleIndex(fetch_tasks_from_table())
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    st.session_state.task_index_synced = mirror.last_sync if mirror is not None else None
+
+def mirror_changed():
+    """Whether the local mirror has synced since the index was built."""
+    mirror = task_mirror.get_mirror(TASK_TABLE_ID)
+    if mirror is None:
+        return False
+    mirror.ensure_fresh()
+    return mirror.last_sync != st.session_state.task_index_synced
 
 def refresh_tasks():
     """Refresh tasks and update session state."""
-    st.session_state.fetched_tasks = fetch_tasks_from_table()
+    table_cache.invalidate(TASK_TABLE_ID)
+    task_mirror.sync_now(TASK_TABLE_ID)
+    load_tasks()
+
+def prepare_export(export_key, tasks, export_format):
+    """Build an export in memory, replacing the previously prepared one."""
+    st.session_state.pop("schedule_export", None)
+    st.session_state.schedule_export = (export_key, schedule_export.export_bytes(tasks, export_format))
+
+# Initialize session state for tasks
+if "task_index" not in st.session_state or mirror_changed():
+    load_tasks()
 
 # Page Content
 st.title("📅 My Schedule")
@@ -75,58 +119,61 @@ st.markdown("Your scheduled tasks are fetched and arranged below.")
 if st.button("🔄 Refresh Schedule"):
     refresh_tasks()
 
-# Fetch tasks from session state
-fetched_tasks = st.session_state.fetched_tasks
+# Fetch the task index from session state
+task_index = st.session_state.task_index
 
 # Dropdown to select date for viewing tasks
-if fetched_tasks:
-    dates_available = sorted({task["task_date"] for task in fetched_tasks})
+if task_index:
     selected_date = st.selectbox(
         "Select Date to View Schedule",
-        options=["All Dates"] + ["Today"] + dates_available,
+        options=["All Dates"] + ["Today"] + task_index.dates,
         index=1  # Default to "Today"
     )
     if selected_date == "Today":
         selected_date = datetime.date.today().strftime("%Y-%m-%d")
 
-    if selected_date != "All Dates":
-        tasks_to_display = [task for task in fetched_tasks if task["task_date"] == selected_date]
-    else:
-        tasks_to_display = fetched_tasks
+    # Cached DataFrame, already sorted by date and time of day with priority emojis applied
+    tasks_df = task_index.frame(None if selected_date == "All Dates" else selected_date)
 
-    if tasks_to_display:
-        tasks_df = pd.DataFrame(tasks_to_display)
-
-        # Sort tasks by `task_date` and `scheduled_time`
-        tasks_df.sort_values(by=["task_date", "scheduled_time"], inplace=True)
-
-        # Add Emojis for Priorities
-        tasks_df["priority"] = tasks_df["priority"].replace(
-            {"High": "🔴 High", "Medium": "🟡 Medium", "Low": "🟢 Low", "Meal": "🍴 Meal"}
-        )
+    if not tasks_df.empty:
+        display_df = tasks_df.drop(columns=["id"], errors="ignore")
 
         # Display the table using AgGrid
-        gb = GridOptionsBuilder.from_dataframe(tasks_df.drop(columns=["id"], errors="ignore"))
+        gb = GridOptionsBuilder.from_dataframe(display_df)
         gb.configure_default_column(editable=False, sortable=True, filterable=True)
         gb.configure_pagination(paginationAutoPageSize=True)
         grid_options = gb.build()
 
         st.write(f"### Scheduled Tasks for {selected_date}")
         AgGrid(
-            tasks_df.drop(columns=["id"], errors="ignore"),
+            display_df,
             gridOptions=grid_options,
             height=500,
             theme="material"
         )
 
-        # Add a "Download Schedule" Button
-        csv = tasks_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Schedule as CSV",
-            data=csv,
-            file_name=f"scheduled_tasks_{selected_date}.csv",
-            mime="text/csv"
+        # Download Schedule: the export is only generated when asked for, and held in memory while offered
+        format_col, prepare_col = st.columns([2, 1])
+        export_format = format_col.selectbox(
+            "Export Format", options=schedule_export.available_formats(), label_visibility="collapsed"
         )
+        export_key = (id(task_index), selected_date, export_format)
+        if prepare_col.button("📥 Prepare Download", use_container_width=True):
+            export_tasks = task_index.all_tasks() if selected_date == "All Dates" else task_index.tasks_on(selected_date)
+            prepare_export(export_key, export_tasks, export_format)
+
+        # The prepared bytes are dropped as soon as the selection changes
+        prepared = st.session_state.get("schedule_export")
+        if prepared is not None and prepared[0] == export_key:
+            extension, mime = schedule_export.FORMATS[export_format]
+            st.download_button(
+                label=f"📥 Download Schedule as {export_format}",
+                data=prepared[1],
+                file_name=f"scheduled_tasks_{selected_date}.{extension}",
+                mime=mime
+            )
+        elif prepared is not None:
+            del st.session_state.schedule_export
     else:
         st.warning(f"No tasks found for {selected_date}!")
 else:
@@ -138,17 +185,16 @@ st.header("🛠️ Task Management")
 
 # --- Delete Specific Task Section ---
 st.subheader("❌ Delete Specific Task")
-if fetched_tasks:
-    dates_available = sorted({task["task_date"] for task in fetched_tasks})
+if task_index:
     selected_date = st.selectbox(
         "Select Date to View Tasks for Deletion",
-        options=["Today"] + dates_available,
+        options=["Today"] + task_index.dates,
         index=0
     )
     if selected_date == "Today":
         selected_date = datetime.date.today().strftime("%Y-%m-%d")
 
-    tasks_for_date = [task for task in fetched_tasks if task["task_date"] == selected_date]
+    tasks_for_date = task_index.tasks_on(selected_date)
 
     if tasks_for_date:
         task_names = [task["task_name"] for task in tasks_for_date]
@@ -168,37 +214,44 @@ else:
 
 # --- Delete All Tasks Section ---
 st.subheader("❌ Delete All Tasks")
-if fetched_tasks:
-    dates_available = sorted({task["task_date"] for task in fetched_tasks})
+if task_index:
     selected_delete_all_date = st.selectbox(
         "Select Date to Delete All Tasks",
-        options=["All Days", "Today"] + dates_available,
+        options=["All Days", "Date Range", "Today"] + task_index.dates,
         index=0
     )
     if selected_delete_all_date == "Today":
         selected_delete_all_date = datetime.date.today().strftime("%Y-%m-%d")
 
     if selected_delete_all_date == "All Days":
-        if st.button("Delete All Tasks for All Days"):
-            task_ids = [task["id"] for task in fetched_tasks]
-            status_code, response_text = delete_tasks_by_ids(task_ids)
-            if status_code == 200:
-                st.success("All tasks for all days removed successfully!")
-                refresh_tasks()
-            else:
-                st.error(f"Failed to delete tasks. Error {status_code}: {response_text}")
+        tasks_for_delete = task_index.tasks
+        delete_label = "All Tasks for All Days"
+        delete_scope = "all days"
+    elif selected_delete_all_date == "Date Range":
+        date_range = st.date_input(
+            "Select Date Range",
+            value=(datetime.date.today(), datetime.date.today() + datetime.timedelta(days=7))
+        )
+        range_start, range_end = (str(date_range[0]), str(date_range[-1])) if date_range else ("", "")
+        tasks_for_delete = task_index.tasks_between(range_start, range_end)
+        delete_label = f"All Tasks from {range_start} to {range_end}"
+        delete_scope = f"{range_start} to {range_end}"
     else:
-        tasks_for_delete_date = [task for task in fetched_tasks if task["task_date"] == selected_delete_all_date]
-        if tasks_for_delete_date:
-            if st.button(f"Delete All Tasks for {selected_delete_all_date}"):
-                task_ids = [task["id"] for task in tasks_for_delete_date]
-                status_code, response_text = delete_tasks_by_ids(task_ids)
-                if status_code == 200:
-                    st.success(f"All tasks for {selected_delete_all_date} removed successfully!")
-                    refresh_tasks()
-                else:
-                    st.error(f"Failed to delete tasks. Error {status_code}: {response_text}")
-        else:
-            st.warning(f"No tasks found for {selected_delete_all_date}.")
+        tasks_for_delete = task_index.tasks_on(selected_delete_all_date)
+        delete_label = f"All Tasks for {selected_delete_all_date}"
+        delete_scope = selected_delete_all_date
+
+    if tasks_for_delete:
+        if st.button(f"Delete {delete_label}"):
+            task_ids = [task["id"] for task in tasks_for_delete]
+            deleted_ids, failures = delete_tasks_in_bulk(task_ids)
+            if not failures:
+                st.success(f"All tasks for {delete_scope} removed successfully!")
+            elif deleted_ids:
+                st.warning(f"Removed {len(deleted_ids)} of {len(task_ids)} tasks for {delete_scope}. "
+                           "Retry to delete the rest.")
+            refresh_tasks()
+    else:
+        st.warning(f"No tasks found for {delete_scope}.")
 else:
     st.warning("No tasks available for deletion.")
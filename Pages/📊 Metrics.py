@@ -0,0 +1,43 @@
+import streamlit as st
+import pandas as pd
+import metrics
+
+# Streamlit Page Configuration
+st.set_page_config(page_title="Metrics", page_icon="📊", layout="wide")
+st.title("📊 Metrics")
+st.markdown("Latency, payload sizes and status codes for JamAI calls, the scheduler and the chatbot.")
+
+if not metrics.ENABLED:
+    st.info("Instrumentation is off. Set METRICS_ENABLED=true and restart the app to start recording.")
+    st.stop()
+
+# Idempotent, so landing here first still starts the scrape endpoint
+metrics.start_server()
+if metrics.METRICS_PORT:
+    st.caption(f"Prometheus scrape endpoint: http://{metrics.METRICS_HOST}:{metrics.METRICS_PORT}/metrics")
+
+histogram_rows, counter_rows = metrics.snapshot()
+
+# Durations are in seconds, sizes in bytes and token counts in tokens; quantiles are bucket estimates
+st.subheader("Histograms")
+if histogram_rows:
+    st.dataframe(pd.DataFrame(histogram_rows), use_container_width=True, hide_index=True)
+else:
+    st.warning("Nothing recorded yet. Use the other pages and come back.")
+
+st.subheader("Call Counts and Status Codes")
+if counter_rows:
+    st.dataframe(pd.DataFrame(counter_rows), use_container_width=True, hide_index=True)
+
+col_refresh, col_reset = st.columns(2)
+if col_refresh.button("🔄 Refresh", use_container_width=True):
+    st.rerun()
+if col_reset.button("🗑️ Reset Metrics", use_container_width=True):
+    metrics.reset()
+    st.rerun()
+
+# Prometheus text dump
+prometheus_text = metrics.prometheus_text()
+with st.expander("Prometheus Text Format"):
+    st.code(prometheus_text, language="text")
+st.download_button("📥 Download Metrics", data=prometheus_text, file_name="metrics.prom", mime="text/plain")
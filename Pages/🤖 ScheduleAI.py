@@ -1,105 +1,202 @@
+import hashlib
+import json
 import os
 from dotenv import load_dotenv
 import streamlit as st
-import requests
-import json
+import time
+import jamai_client
+import response_cache
+import chat_log_writer
+import chat_history
+import chat_context
+import metrics
 
 # Load environment variables
 load_dotenv()
 
 # Environment Variables
 JAMAI_API_KEY = os.getenv("JAMAI_API_KEY")
-PROJECT_ID = os.getenv("PROJECT_ID")
-BASE_URL = os.getenv("BASE_URL")
 TASK_TABLE_ID = os.getenv("TASK_TABLE_ID")
 PRODUCTIVITY_TIPS_TABLE_ID = os.getenv("PRODUCTIVITY_TIPS_TABLE_ID")
-CHAT_COMPLETIONS_ENDPOINT = f"{BASE_URL}/api/v1/chat/completions"
+CHAT_COMPLETIONS_ENDPOINT = "chat/completions"
 KNOWLEDGE_TABLE_ID = os.getenv("productivity_ideas")
 CHAT_TABLE_ID = os.getenv("CHAT_TABLE_ID")
 
-# API Headers
-headers = {
-    "Authorization": f"Bearer {JAMAI_API_KEY}",
-    "X-PROJECT-ID": PROJECT_ID,
-    "Content-Type": "application/json",
-    "Accept": "application/json"
-}
+# RAG completion settings
+CHAT_MODEL = "ellm/meta-llama/Llama-3.1-8B-Instruct"
+RAG_K = 3
+
+# Chat log batching: rows per request and the longest a row waits before being sent
+CHAT_LOG_BATCH_SIZE = int(os.getenv("CHAT_LOG_BATCH_SIZE", "20"))
+CHAT_LOG_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "2"))
+
+# Response cache settings; CHAT_CACHE_SIMILARITY (0-1) turns on near-duplicate matching
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "256"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_PATH = os.getenv("CHAT_CACHE_PATH")
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY")) if os.getenv("CHAT_CACHE_SIMILARITY") else None
+
+# Chat history: turns kept in memory per session, turns rendered per page and an optional spill directory for older turns
+CHAT_HISTORY_LIMIT = int(os.getenv("CHAT_HISTORY_LIMIT", "50"))
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "10"))
+CHAT_HISTORY_SPILL_DIR = os.getenv("CHAT_HISTORY_SPILL_DIR")
+# Spill files not written to for this many seconds are deleted when a new session starts
+CHAT_HISTORY_SPILL_MAX_AGE = float(os.getenv("CHAT_HISTORY_SPILL_MAX_AGE", "86400"))
+
+# Multi-turn context: hard cap on the estimated tokens of the messages sent, and whether evicted turns are summarized
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "1000"))
+CHAT_CONTEXT_SUMMARIZE = os.getenv("CHAT_CONTEXT_SUMMARIZE", "true").lower() in ("1", "true", "yes")
+
+
+# Shared answer cache for every session
+@st.cache_resource
+def get_response_cache():
+    return response_cache.ResponseCache(
+        capacity=CHAT_CACHE_SIZE, ttl=CHAT_CACHE_TTL,
+        disk_path=CHAT_CACHE_PATH, similarity_threshold=CHAT_CACHE_SIMILARITY
+    )
+
 
+# Shared background writer that batches chat logs for every session
+@st.cache_resource
+def get_chat_log_writer():
+    return chat_log_writer.ChatLogWriter(
+        CHAT_TABLE_ID, token=JAMAI_API_KEY, max_batch=CHAT_LOG_BATCH_SIZE, flush_interval=CHAT_LOG_FLUSH_INTERVAL
+    )
 
-# Function to add user inputs and AI responses to the Chat Table
+
+# Function to add user inputs and AI responses to the Chat Table (queued, sent in the background)
+@metrics.timed("add_response_to_chat_table")
 def add_response_to_chat_table(user_input, ai_response):
-    url = f"{BASE_URL}/api/v1/gen_tables/chat/rows/add"
-    payload = {
-        "table_id": CHAT_TABLE_ID,
-        "data": [
-            {
-                "User": user_input,
-                "AI": ai_response
-            }
-        ]
-    }
+    if not get_chat_log_writer().log(user_input, ai_response):
+        st.warning("The chat log is backed up, so this exchange was not logged.")
+
+
+# Function to assemble the messages for a question, packing earlier turns under the token budget
+def build_chat_messages(user_input, history=None):
+    # Only turns still held in memory are considered; older ones never fit the budget anyway
+    turns = history.recent(history.capacity) if history is not None else []
+    return chat_context.build_messages(turns, user_input, CHAT_CONTEXT_TOKENS, summarize=CHAT_CONTEXT_SUMMARIZE)
 
-    # Debugging Payload
-    print("Payload being sent to Chat Table:", json.dumps(payload, indent=2))
 
-    response = requests.post(url, headers=headers, json=payload)
-    if response.status_code == 200:
-        st.success("Response logged successfully!")
-    else:
-        st.error(f"Error adding response to chat table: {response.text}")
+# Function to fingerprint the context a cached answer depends on: only the last exchange sent before the question.
+# Older turns and the summary are left out, so a follow-up asked after the same previous exchange hits the cache
+# whatever came earlier in the session; a question sent without any earlier exchange is keyed on "" and shared by all.
+def context_key(messages):
+    last_exchange = [message for message in messages[-3:-1] if message["role"] != "system"]
+    if not last_exchange:
+        return ""
+    return hashlib.sha1(json.dumps(last_exchange).encode("utf-8")).hexdigest()
 
 
-# Function to fetch a response from the Knowledge Table using RAG
-def get_chat_response_from_knowledge_table(user_input):
+# Function to stream a response from the Knowledge Table using RAG
+def stream_chat_response(messages, stats=None):
+    """
+    Yield the answer's text deltas as they arrive. When given, `stats` is filled with
+    time_to_first_token and tokens_per_second (one streamed delta counts as one token).
+    """
     payload = {
-        "messages": [
-            {"role": "user", "content": user_input}
-        ],
-        "model": "ellm/meta-llama/Llama-3.1-8B-Instruct",
+        "messages": messages,
+        "model": CHAT_MODEL,
         "knowledge_table_id": KNOWLEDGE_TABLE_ID,
         "temperature": 0.7,
         "max_tokens": 200,
         "reranking_model": "cohere/embed-multilingual-v3.0",
-        "k": 3,
+        "k": RAG_K,
         "stream": True
     }
 
-    response = requests.post(CHAT_COMPLETIONS_ENDPOINT, headers=headers, json=payload, stream=True)
-    if response.status_code == 200:
-        full_response = ""
-        for chunk in response.iter_lines():
-            if chunk:
-                chunk_data = chunk.decode("utf-8")
-                if chunk_data.startswith("data: "):
-                    chunk_data = chunk_data[6:]
-                    if chunk_data.strip() == "[DONE]":
-                        break
-                    try:
-                        json_data = json.loads(chunk_data)
-                        if "choices" in json_data and json_data["choices"]:
-                            content = json_data["choices"][0]["delta"].get("content", "")
-                            full_response += content
-                    except json.JSONDecodeError:
-                        continue
-        return full_response.strip()
-    else:
-        st.error(f"Error fetching response: {response.status_code} - {response.text}")
-        return "I couldn't find an answer. Please try rephrasing your query."
+    started = time.perf_counter()
+    first_token_at = None
+    token_count = 0
+    with jamai_client.post(CHAT_COMPLETIONS_ENDPOINT, token=JAMAI_API_KEY, json=payload, stream=True) as response:
+        if response.status_code != 200:
+            st.error(f"Error fetching response: {response.status_code} - {response.text}")
+            yield "I couldn't find an answer. Please try rephrasing your query."
+            return
+        for delta in jamai_client.iter_chat_deltas(response):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            token_count += 1
+            yield delta
+
+    if first_token_at is None:
+        return
+    generation_time = time.perf_counter() - first_token_at
+    tokens_per_second = token_count / generation_time if generation_time > 0 else 0.0
+    metrics.observe("chat_time_to_first_token_seconds", first_token_at - started)
+    metrics.observe("chat_stream_seconds", time.perf_counter() - started)
+    metrics.observe("chat_response_tokens", token_count, metrics.SIZE_BUCKETS)
+    if stats is not None:
+        stats["time_to_first_token"] = first_token_at - started
+        stats["tokens_per_second"] = tokens_per_second
+
+
+# Function to fetch a response from the Knowledge Table using RAG, answering repeats from the cache
+@metrics.timed("get_chat_response_from_knowledge_table")
+def get_chat_response_from_knowledge_table(user_input, history=None, render="".join):
+    """
+    Return (answer, stream stats). A cached answer comes back with stats None; otherwise
+    the response stream is passed to `render`, which consumes it and returns the text.
+    """
+    messages = build_chat_messages(user_input, history)
+    context = context_key(messages)
+    cache = get_response_cache()
+    cached_response = cache.get(user_input, CHAT_MODEL, RAG_K, KNOWLEDGE_TABLE_ID, context=context)
+    if cached_response is not None:
+        return cached_response, None
+
+    stream_stats = {}
+    ai_response = render(stream_chat_response(messages, stream_stats)).strip()
+    # Only answers that actually streamed are cached, never the error fallback
+    if stream_stats:
+        cache.put(user_input, CHAT_MODEL, RAG_K, KNOWLEDGE_TABLE_ID, ai_response, context=context)
+    return ai_response, stream_stats
+
+
+# Function to show a streamed answer as it is generated
+def write_response_stream(stream):
+    st.markdown("**AI:**")
+    return st.write_stream(stream)
 
 
 # Streamlit Page Configuration
 st.set_page_config(page_title="ScheduleAI", page_icon="🤖", layout="wide")
 st.title("🤖 ScheduleBot Chatbot")
 
+# Response cache counters
+cache_stats = get_response_cache().stats()
+st.sidebar.caption(
+    f"Answer cache: {cache_stats['hits'] + cache_stats['near_hits'] + cache_stats['disk_hits']} hits "
+    f"({cache_stats['near_hits']} near-duplicate), {cache_stats['misses']} misses, "
+    f"{cache_stats['hit_rate']:.0%} hit rate"
+)
+
 # Initialize chat history in session state
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-
-# Display Chat History
-
-for chat in st.session_state.chat_history:
-    st.markdown(f"**You:** {chat['user_input']}")
-    st.markdown(f"**AI:** {chat['ai_response']}")
+    st.session_state.chat_history = chat_history.ChatHistory(
+        capacity=CHAT_HISTORY_LIMIT, spill_dir=CHAT_HISTORY_SPILL_DIR, spill_max_age=CHAT_HISTORY_SPILL_MAX_AGE
+    )
+if "chat_history_page" not in st.session_state:
+    st.session_state.chat_history_page = 0
+
+# Display Chat History, one page of turns at a time with the newest page first
+history = st.session_state.chat_history
+page_count = max(1, -(-(len(history) - history.first_available) // CHAT_HISTORY_PAGE_SIZE))
+if page_count > 1:
+    older_col, newer_col = st.columns(2)
+    if older_col.button("Show older", use_container_width=True,
+                        disabled=st.session_state.chat_history_page >= page_count - 1):
+        st.session_state.chat_history_page += 1
+    if newer_col.button("Show newer", use_container_width=True, disabled=st.session_state.chat_history_page == 0):
+        st.session_state.chat_history_page -= 1
+    st.session_state.chat_history_page = min(st.session_state.chat_history_page, page_count - 1)
+    st.caption(f"Page {st.session_state.chat_history_page + 1} of {page_count}, newest first")
+
+page_stop = len(history) - st.session_state.chat_history_page * CHAT_HISTORY_PAGE_SIZE
+for past_input, past_response in history.turns(page_stop - CHAT_HISTORY_PAGE_SIZE, page_stop):
+    st.markdown(f"**You:** {past_input}")
+    st.markdown(f"**AI:** {past_response}")
 
 # Bottom-aligned Input Box and Send Button
 st.markdown("---")
@@ -114,14 +211,20 @@ send_button = st.button("Send", use_container_width=True)
 
 # Handle User Input
 if send_button and user_input:
-    # Fetch AI response
-    ai_response = get_chat_response_from_knowledge_table(user_input)
+    # Answer repeated questions from the cache, otherwise stream the response as it is generated
+    ai_response, stream_stats = get_chat_response_from_knowledge_table(
+        user_input, st.session_state.chat_history, render=write_response_stream
+    )
+    if stream_stats is None:
+        st.markdown(f"**AI:** {ai_response}")
+        st.caption("Answered from cache")
+    elif stream_stats:
+        st.caption(f"First token after {stream_stats['time_to_first_token']:.2f}s · "
+                   f"{stream_stats['tokens_per_second']:.1f} tokens/s")
 
     # Add to chat history
-    st.session_state.chat_history.append({"user_input": user_input, "ai_response": ai_response})
-
-    # Display the latest AI response in the "Ask a Question" section
-    st.markdown(f"**AI:** {ai_response}")
+    st.session_state.chat_history.append(user_input, ai_response)
+    st.session_state.chat_history_page = 0
 
     # Log response in the chat table
     add_response_to_chat_table(user_input, ai_response)
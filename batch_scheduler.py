@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from scheduler import (
+    DAY_END,
+    DAY_START,
+    MEAL_TIMELINE,
+    MEAL_TIMES,
+    MINUTES_PER_DAY,
+    PRIORITY_ORDER,
+    build_timeline,
+    format_minutes,
+)
+
+# "HH:MM" labels indexed by minute, for vectorized formatting
+_CLOCK_LABELS = np.array([format_minutes(minute) for minute in range(MINUTES_PER_DAY + 1)], dtype=object)
+
+
+def _grouped_cumsum(values, group_starts):
+    """
+    Inclusive cumulative sum of `values` restarting at every group start.
+    """
+    totals = np.cumsum(values)
+    before_group = np.repeat(totals[group_starts] - values[group_starts], np.diff(np.append(group_starts, len(values))))
+    return totals - before_group
+
+
+def _first_per_group(mask, group_ids):
+    """
+    Return (group_ids, row indices) of the first True row of every group that has one.
+    """
+    rows = np.flatnonzero(mask)
+    groups, first = np.unique(group_ids[rows], return_index=True)
+    return groups, rows[first]
+
+
+def _sort_codes(values):
+    """
+    Integer codes that sort like `values`, with missing values last as sort_values puts them.
+    Only the distinct values are sorted, in Python order like sorted() in calculate_schedule.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    ranks = np.empty(len(uniques) + 1, dtype=np.int64)
+    ranks[sorted(range(len(uniques)), key=uniques.__getitem__)] = np.arange(len(uniques))
+    # Missing values are coded -1, which picks the last slot
+    ranks[-1] = len(uniques)
+    return ranks[codes]
+
+
+def schedule_batch(tasks, group_by=("owner", "task_date"), blocks=None):
+    """
+    Schedule many days at once from a columnar table.
+
+    `tasks` is a DataFrame (or dict of arrays) with priority, estimated_time,
+    the `group_by` columns and optionally task_name. Every group is scheduled
+    exactly like scheduler.calculate_schedule, using grouped cumulative sums
+    shifted around each fixed block instead of a Python loop per task.
+
+    Returns a DataFrame in calculate_schedule's row order per group, with fixed
+    block rows inserted and scheduled_time, start_minute and end_minute columns.
+    """
+    group_by = list(group_by)
+    frame = pd.DataFrame(tasks).reset_index(drop=True)
+    if "task_name" not in frame:
+        frame["task_name"] = ""
+    block_starts, block_ends, block_names = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+    if frame.empty:
+        return frame.assign(scheduled_time=pd.Series(dtype=object), start_minute=pd.Series(dtype="int64"),
+                            end_minute=pd.Series(dtype="int64"))
+
+    # Same order as calculate_schedule within each group, sorted on integer codes.
+    # lexsort is stable like sorted() and takes its primary key last.
+    # Names are ordered first; the stable lexsort on (group, priority) then keeps that order within ties.
+    group_codes = [_sort_codes(frame[column]) for column in group_by]
+    rank = frame["priority"].map(PRIORITY_ORDER).fillna(999).to_numpy()
+    names = np.asarray(frame["task_name"].fillna("").astype(str), dtype=object)
+    by_name = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64)
+    order = by_name[np.lexsort([rank[by_name]] + [codes[by_name] for codes in group_codes[::-1]])]
+
+    row_count = len(frame)
+    new_group = np.zeros(row_count, dtype=bool)
+    new_group[:1] = True
+    for codes in group_codes:
+        sorted_codes = codes[order]
+        new_group[1:] |= sorted_codes[1:] != sorted_codes[:-1]
+    group_starts = np.flatnonzero(new_group)
+    group_ids = np.cumsum(new_group) - 1
+    positions = np.arange(row_count) - group_starts[group_ids]
+
+    durations = np.rint(frame["estimated_time"].to_numpy(dtype=float)[order] * 60).astype(np.int64)
+    starts = DAY_START + _grouped_cumsum(durations, group_starts) - durations
+
+    # Push every group's timeline past each block its cursor lands in, block by block
+    block_hits = []
+    for order_index, (block_start, block_end) in enumerate(zip(block_starts, block_ends)):
+        groups, rows = _first_per_group(starts >= block_start, group_ids)
+        inside = starts[rows] < block_end
+        groups, rows = groups[inside], rows[inside]
+        shifts = np.zeros(row_count, dtype=np.int64)
+        shifts[rows] = block_end - starts[rows]
+        starts = starts + _grouped_cumsum(shifts, group_starts)
+        block_hits.append((order_index, groups, rows))
+    ends = starts + durations
+
+    # Scheduling stops at each group's first task that overruns the day
+    cut = np.full(len(group_starts), np.iinfo(np.int64).max)
+    overrun_groups, overrun_rows = _first_per_group(ends > DAY_END, group_ids)
+    cut[overrun_groups] = positions[overrun_rows]
+    kept = positions < cut[group_ids]
+
+    # A block is emitted before the task that landed in it, even if that task then overruns.
+    # Block hits are keyed on that task's sorted row, and on block order between adjacent blocks.
+    block_rows, block_orders = [], []
+    for order_index, groups, rows in block_hits:
+        rows = rows[positions[rows] <= cut[groups]]
+        block_rows.append(rows)
+        block_orders.append(np.full(len(rows), order_index))
+    block_rows = np.concatenate(block_rows) if block_rows else np.zeros(0, dtype=np.int64)
+    block_orders = np.concatenate(block_orders) if block_orders else np.zeros(0, dtype=np.int64)
+    block_sequence = np.lexsort((block_orders, block_rows))
+    block_rows, block_orders = block_rows[block_sequence], block_orders[block_sequence]
+
+    # Output offsets: kept tasks and blocks before a row, plus blocks landing on it
+    kept_rows = np.flatnonzero(kept)
+    kept_before = np.cumsum(kept) - kept
+    task_offsets = kept_before[kept_rows] + np.searchsorted(block_rows, kept_rows, side="right")
+    block_offsets = kept_before[block_rows] + np.arange(len(block_rows))
+    total = len(kept_rows) + len(block_rows)
+
+    block_names = np.array(block_names, dtype=object)
+    block_starts = np.asarray(block_starts, dtype=np.int64)
+    block_ends = np.asarray(block_ends, dtype=np.int64)
+    block_minutes = block_ends - block_starts
+    block_hours = np.where(block_minutes % 60 == 0, block_minutes // 60, block_minutes / 60)
+    block_values = {
+        "task_name": block_names[block_orders],
+        "priority": np.where(np.isin(block_names, list(MEAL_TIMES)), "Meal", "Blocked").astype(object)[block_orders],
+        "estimated_time": block_hours[block_orders],
+    }
+    for column in group_by:
+        block_values[column] = frame[column].take(order[block_rows]).to_numpy()
+
+    # One gather for the task rows; block rows come back empty (label -1) and are filled in below
+    source_rows = np.full(total, -1, dtype=np.int64)
+    source_rows[task_offsets] = order[kept_rows]
+    result = frame.reindex(source_rows).reset_index(drop=True)
+    for column, values in block_values.items():
+        result.iloc[block_offsets, result.columns.get_loc(column)] = values
+
+    start_minutes = np.empty(total, dtype=np.int64)
+    start_minutes[task_offsets], start_minutes[block_offsets] = starts[kept_rows], block_starts[block_orders]
+    end_minutes = np.empty(total, dtype=np.int64)
+    end_minutes[task_offsets], end_minutes[block_offsets] = ends[kept_rows], block_ends[block_orders]
+    # Format each distinct (start, end) pair once
+    slots, slot_ids = np.unique(start_minutes * (MINUTES_PER_DAY + 1) + end_minutes, return_inverse=True)
+    slot_starts, slot_ends = np.divmod(slots, MINUTES_PER_DAY + 1)
+    return result.assign(
+        start_minute=start_minutes,
+        end_minute=end_minutes,
+        scheduled_time=(_CLOCK_LABELS[slot_starts] + "-" + _CLOCK_LABELS[slot_ends])[slot_ids.reshape(-1)],
+    )
@@ -0,0 +1,213 @@
+"""
+Benchmark scheduler.py on synthetic workloads.
+
+Usage:
+    python benchmarks/bench_scheduler.py --sizes 10 1000 100000 1000000 --output results.json
+    python benchmarks/bench_scheduler.py --baseline results.json --max-regression 0.10
+
+benchmarks/check_batch_scheduler.py checks that schedule_batch still matches
+calculate_schedule row for row; run it alongside this after scheduler changes.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scheduler  # noqa: E402
+from benchmarks.workloads import PROFILES, generate_days, generate_tasks  # noqa: E402
+
+DEFAULT_SIZES = (10, 1_000, 100_000, 1_000_000)
+
+# Calls traced for the peak memory figure (tracing every call would dominate the run)
+MEMORY_SAMPLE_CALLS = 200
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_calculate_schedule(owner, task_date, tasks, meals):
+    scheduler.calculate_schedule(tasks)
+
+
+def run_add_and_schedule_tasks(owner, task_date, tasks, meals):
+    scheduler.add_and_schedule_tasks(tasks, meals)
+
+
+# Per-day scenarios: each call schedules one owner's day
+DAY_SCENARIOS = {
+    "calculate_schedule": run_calculate_schedule,
+    "add_and_schedule_tasks": run_add_and_schedule_tasks,
+}
+
+
+def bench_per_day(scenario, size, profile, seed):
+    """
+    Time one call per synthetic day. Task dicts are copied outside the timed
+    region since both functions write into their input.
+    """
+    run = DAY_SCENARIOS[scenario]
+    latencies = []
+    task_total = 0
+    for owner, task_date, tasks, meals in generate_days(size, seed=seed, **PROFILES[profile]):
+        day_tasks = [dict(task) for task in tasks]
+        started = time.perf_counter()
+        run(owner, task_date, day_tasks, meals)
+        latencies.append(time.perf_counter() - started)
+        task_total += len(tasks)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        days = generate_days(min(size, MEMORY_SAMPLE_CALLS * 12), seed=seed, **PROFILES[profile])
+        for call, (owner, task_date, tasks, meals) in enumerate(days):
+            if call >= MEMORY_SAMPLE_CALLS:
+                break
+            day_tasks = [dict(task) for task in tasks]
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run(owner, task_date, day_tasks, meals)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return latencies, task_total, peak
+
+
+def bench_batch(size, profile, seed):
+    """
+    Time batch_scheduler.schedule_batch on the whole workload as one table.
+    """
+    import pandas as pd
+    from batch_scheduler import schedule_batch
+
+    frame = pd.DataFrame.from_records(generate_tasks(size, seed=seed, **PROFILES[profile]))
+    started = time.perf_counter()
+    schedule_batch(frame)
+    latency = time.perf_counter() - started
+
+    # Second, traced run for memory since tracing slows the call down
+    tracemalloc.start()
+    try:
+        schedule_batch(frame)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return [latency], len(frame), peak
+
+
+def run_benchmarks(sizes, profiles, scenarios, seed):
+    results = []
+    for profile in profiles:
+        for size in sizes:
+            for scenario in scenarios:
+                if scenario == "schedule_batch":
+                    latencies, task_total, peak = bench_batch(size, profile, seed)
+                else:
+                    latencies, task_total, peak = bench_per_day(scenario, size, profile, seed)
+                total_seconds = sum(latencies)
+                latencies.sort()
+                result = {
+                    "scenario": scenario,
+                    "profile": profile,
+                    "size": size,
+                    "calls": len(latencies),
+                    "tasks": task_total,
+                    "total_seconds": total_seconds,
+                    "tasks_per_second": task_total / total_seconds if total_seconds else 0.0,
+                    "latency_p50_us": percentile(latencies, 0.50) * 1e6,
+                    "latency_p95_us": percentile(latencies, 0.95) * 1e6,
+                    "latency_p99_us": percentile(latencies, 0.99) * 1e6,
+                    "peak_memory_kb": peak / 1024,
+                }
+                results.append(result)
+                print(
+                    f"{scenario:<24} {profile:<11} {size:>9,} tasks  "
+                    f"{result['tasks_per_second']:>12,.0f} tasks/s  "
+                    f"p50 {result['latency_p50_us']:>9.1f}us  p95 {result['latency_p95_us']:>9.1f}us  "
+                    f"p99 {result['latency_p99_us']:>9.1f}us  peak {result['peak_memory_kb']:>9.1f}KiB",
+                    flush=True,
+                )
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_to_baseline(results, baseline_path, max_regression):
+    """
+    Print throughput change per result against a saved run.
+    Returns the number of results slower than allowed.
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {
+            (result["scenario"], result["profile"], result["size"]): result
+            for result in json.load(baseline_file)["results"]
+        }
+
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["scenario"], result["profile"], result["size"]))
+        if not previous or not previous["tasks_per_second"]:
+            continue
+        change = result["tasks_per_second"] / previous["tasks_per_second"] - 1
+        flag = ""
+        if change < -max_regression:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{result['scenario']:<24} {result['profile']:<11} {result['size']:>9,} tasks  "
+              f"throughput {change:+.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scheduler.py on synthetic workloads.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=sorted(PROFILES))
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(DAY_SCENARIOS) + ["schedule_batch"],
+                        default=sorted(DAY_SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a JSON file from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed throughput drop against the baseline before exiting non-zero")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.profiles, args.scenarios, args.seed)
+
+    if args.output:
+        report = {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        return 1 if compare_to_baseline(results, args.baseline, args.max_regression) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Check that batch_scheduler.schedule_batch matches scheduler.calculate_schedule
+row for row on randomized multi-owner tables, with the meal blocks and with
+custom (including adjacent) blocks. Exits non-zero on the first mismatch.
+
+Usage:
+    python benchmarks/check_batch_scheduler.py
+    python benchmarks/check_batch_scheduler.py --cases 200 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import batch_scheduler  # noqa: E402
+import scheduler  # noqa: E402
+
+PRIORITIES = ["High", "Medium", "Low", "Meal", "Unknown"]
+DURATIONS = [0.25, 0.5, 0.75, 1, 1.5, 2, 3, 4]
+BLOCK_SETS = [
+    None,
+    {"Standup": ("09:00", "09:15"), "Lunch": ("12:00", "13:00")},
+    {"Focus": ("09:00", "10:00"), "Review": ("10:00", "10:30"), "Late": ("22:00", "23:00")},
+]
+
+
+def random_table(rng, owners, days, max_tasks):
+    rows = []
+    for owner in range(owners):
+        for day in range(days):
+            for _ in range(rng.randint(0, max_tasks)):
+                rows.append({
+                    "owner": f"user-{owner}",
+                    "task_date": f"2024-05-{day + 1:02d}",
+                    # Few distinct names so ties on (priority, name) are common
+                    "task_name": rng.choice("ABCDE") + str(rng.randint(0, 3)),
+                    "priority": rng.choice(PRIORITIES),
+                    "estimated_time": rng.choice(DURATIONS),
+                })
+    return pd.DataFrame(rows)
+
+
+def expected_rows(table, blocks):
+    rows = []
+    for (owner, task_date), group in table.groupby(["owner", "task_date"], sort=True):
+        for entry in scheduler.calculate_schedule(group.to_dict("records"), blocks=blocks):
+            rows.append((owner, task_date, entry["task_name"], entry["priority"],
+                         float(entry["estimated_time"]), entry["scheduled_time"]))
+    return rows
+
+
+def batch_rows(table, blocks):
+    result = batch_scheduler.schedule_batch(table, blocks=blocks)
+    return [(row.owner, row.task_date, row.task_name, row.priority, float(row.estimated_time), row.scheduled_time)
+            for row in result.itertuples()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare schedule_batch with calculate_schedule.")
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rows_checked = 0
+    for case in range(args.cases):
+        table = random_table(rng, owners=rng.randint(1, 30), days=rng.randint(1, 4), max_tasks=rng.randint(1, 25))
+        if table.empty:
+            continue
+        blocks = BLOCK_SETS[case % len(BLOCK_SETS)]
+        expected = expected_rows(table, blocks)
+        got = batch_rows(table, blocks)
+        if got != expected:
+            index = next((i for i, (a, b) in enumerate(zip(got, expected)) if a != b), min(len(got), len(expected)))
+            print(f"Case {case} (seed {args.seed}) differs at row {index}: "
+                  f"batch {got[index:index + 1]} vs calculate_schedule {expected[index:index + 1]} "
+                  f"({len(got)} vs {len(expected)} rows)", file=sys.stderr)
+            return 1
+        rows_checked += len(expected)
+    print(f"schedule_batch matched calculate_schedule on {args.cases} cases ({rows_checked:,} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
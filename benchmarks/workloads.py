@@ -0,0 +1,72 @@
+import random
+from datetime import date, timedelta
+
+# Share of tasks per priority
+PRIORITY_MIXES = {
+    "balanced": {"High": 1, "Medium": 1, "Low": 1},
+    "high-heavy": {"High": 7, "Medium": 2, "Low": 1},
+    "low-heavy": {"High": 1, "Medium": 2, "Low": 7},
+}
+
+# Candidate estimated times (hours) and their weights
+DURATION_DISTRIBUTIONS = {
+    "short": ([0.25, 0.5, 1], [2, 3, 5]),
+    "mixed": ([0.5, 1, 2, 3, 4], [2, 4, 2, 1, 1]),
+    "long": ([2, 3, 4, 6], [3, 3, 2, 1]),
+}
+
+# How meals are chosen for each day
+MEAL_SELECTIONS = ("none", "all", "random")
+
+# Named combinations the benchmark runs by default
+PROFILES = {
+    "default": {"priority_mix": "balanced", "durations": "short", "meals": "all"},
+    "high-heavy": {"priority_mix": "high-heavy", "durations": "mixed", "meals": "random"},
+    "long-tasks": {"priority_mix": "low-heavy", "durations": "long", "meals": "none"},
+}
+
+
+def generate_days(task_count, priority_mix="balanced", durations="short", meals="all",
+                  tasks_per_day=12, owners=100, seed=0):
+    """
+    Yield (owner, task_date, tasks, meals) for synthetic days holding `task_count` tasks in total.
+    Days are generated lazily so large workloads are never fully materialized.
+    """
+    rng = random.Random(seed)
+    priorities, priority_weights = zip(*PRIORITY_MIXES[priority_mix].items())
+    hours, hour_weights = DURATION_DISTRIBUTIONS[durations]
+    first_day = date(2024, 1, 1)
+
+    produced = 0
+    day_index = 0
+    while produced < task_count:
+        count = min(max(1, round(rng.gauss(tasks_per_day, tasks_per_day / 4))), task_count - produced)
+        owner = f"user-{day_index % owners}"
+        task_date = str(first_day + timedelta(days=day_index // owners))
+        tasks = [
+            {
+                "task_name": f"task-{produced + offset}",
+                "priority": rng.choices(priorities, priority_weights)[0],
+                "estimated_time": rng.choices(hours, hour_weights)[0],
+                "task_date": task_date,
+            }
+            for offset in range(count)
+        ]
+        if meals == "all":
+            day_meals = ["Breakfast", "Lunch", "Dinner"]
+        elif meals == "random":
+            day_meals = [meal for meal in ("Breakfast", "Lunch", "Dinner") if rng.random() < 0.5]
+        else:
+            day_meals = []
+        yield owner, task_date, tasks, day_meals
+        produced += count
+        day_index += 1
+
+
+def generate_tasks(task_count, **options):
+    """
+    Yield flat task dicts (with an "owner" column) for the same workload as generate_days.
+    """
+    for owner, _, tasks, _ in generate_days(task_count, **options):
+        for task in tasks:
+            yield dict(task, owner=owner)
@@ -0,0 +1,87 @@
+import re
+from functools import lru_cache
+
+# Rough per-message cost of the role and separators in the chat template
+MESSAGE_OVERHEAD = 4
+# Longest a summary of evicted turns may grow, in tokens
+SUMMARY_MAX_TOKENS = 120
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Approximate token count without a model tokenizer: every punctuation mark is
+    one token and every word one token per four characters, which tracks BPE
+    tokenizers closely for English and errs high rather than low.
+    """
+    return sum(-(-len(piece) // 4) for piece in _PIECES.findall(text))
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def truncate_to_budget(text, budget):
+    """
+    Cut `text` down to at most `budget` estimated tokens, keeping the beginning.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    used = 0
+    for match in _PIECES.finditer(text):
+        used += -(-len(match.group()) // 4)
+        if used > budget:
+            return text[:match.start()].rstrip()
+    return text
+
+
+@lru_cache(maxsize=256)
+def summarize_turns(turns, max_tokens=SUMMARY_MAX_TOKENS):
+    """
+    Extractive summary of (user_input, ai_response) turns that no longer fit the
+    budget: the first sentence of each question, newest first until `max_tokens`
+    is reached. Cached on the turns, so a follow-up that evicts the same turns
+    reuses it.
+    """
+    questions = []
+    used = estimate_tokens("Earlier in this conversation the user asked:")
+    for user_input, _ in reversed(turns):
+        question = re.split(r"(?<=[.?!])\s", user_input.strip(), maxsplit=1)[0]
+        cost = estimate_tokens(question) + 1
+        if used + cost > max_tokens:
+            break
+        questions.append(question)
+        used += cost
+    if not questions:
+        return ""
+    return "Earlier in this conversation the user asked: " + "; ".join(reversed(questions))
+
+
+def build_messages(turns, user_input, budget, summarize=True):
+    """
+    Assemble chat messages for `user_input` whose estimated size never exceeds
+    `budget` tokens. Past (user_input, ai_response) turns are packed newest
+    first and kept whole; when older turns are evicted and `summarize` is set,
+    a short summary of them is added as a system message if it still fits.
+    """
+    user_message = {"role": "user", "content": truncate_to_budget(user_input, budget - MESSAGE_OVERHEAD)}
+    remaining = budget - message_tokens(user_message)
+
+    packed = []
+    kept = 0
+    for past_input, past_response in reversed(turns):
+        pair = [{"role": "user", "content": past_input}, {"role": "assistant", "content": past_response}]
+        cost = sum(message_tokens(message) for message in pair)
+        if cost > remaining:
+            break
+        packed[:0] = pair
+        remaining -= cost
+        kept += 1
+
+    evicted = tuple(turns[:len(turns) - kept])
+    if summarize and evicted and remaining > MESSAGE_OVERHEAD:
+        summary = summarize_turns(evicted, min(SUMMARY_MAX_TOKENS, remaining - MESSAGE_OVERHEAD))
+        if summary:
+            packed.insert(0, {"role": "system", "content": summary})
+    return packed + [user_message]
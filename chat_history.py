@@ -0,0 +1,99 @@
+import glob
+import json
+import os
+import time
+import uuid
+from array import array
+from collections import deque
+
+
+class ChatHistory:
+    """
+    Bounded per-session chat history.
+
+    The latest `capacity` turns are kept in memory as (user_input, ai_response)
+    tuples. Older turns are appended to a JSON Lines file under `spill_dir` when
+    one is given, with their byte offsets indexed so any page can be read back
+    with a single seek. Without a spill directory older turns are only dropped
+    from memory, since every exchange is already logged to the chat table.
+
+    Spill files are never removed when a session ends, so each new history
+    deletes the ones in `spill_dir` not written to for `spill_max_age` seconds.
+    """
+
+    def __init__(self, capacity=50, spill_dir=None, spill_max_age=86400):
+        self.capacity = capacity
+        self._recent = deque()
+        self._spilled_count = 0
+        self._spill_path = None
+        # Index of the first turn in the spill file and the byte offset of each turn in it
+        self._spill_start = 0
+        self._spill_offsets = array("q")
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            prune_spill_files(spill_dir, spill_max_age)
+            self._spill_path = os.path.join(spill_dir, f"chat-{uuid.uuid4().hex}.jsonl")
+
+    def __len__(self):
+        return self._spilled_count + len(self._recent)
+
+    @property
+    def first_available(self):
+        """
+        Index of the oldest turn that can still be read back.
+        """
+        if not self._spill_path:
+            return self._spilled_count
+        self._check_spill_file()
+        return self._spill_start
+
+    def append(self, user_input, ai_response):
+        if len(self._recent) >= self.capacity:
+            self._spill(self._recent.popleft())
+        self._recent.append((user_input, ai_response))
+
+    def _check_spill_file(self):
+        # A session idle for longer than the max age can have its file pruned by another session;
+        # the turns in it are gone, so later spills start a fresh file
+        if self._spill_offsets and not os.path.exists(self._spill_path):
+            self._spill_start = self._spilled_count
+            self._spill_offsets = array("q")
+
+    def _spill(self, turn):
+        if self._spill_path:
+            self._check_spill_file()
+            with open(self._spill_path, "ab") as spill_file:
+                self._spill_offsets.append(spill_file.tell())
+                spill_file.write(json.dumps(turn).encode("utf-8") + b"\n")
+        self._spilled_count += 1
+
+    def turns(self, start, stop):
+        """
+        Return turns with indexes in [start, stop), oldest first, as (user_input, ai_response) tuples.
+        """
+        start = max(start, self.first_available)
+        stop = min(stop, len(self))
+        turns = []
+        if start < min(stop, self._spilled_count):
+            with open(self._spill_path, "rb") as spill_file:
+                spill_file.seek(self._spill_offsets[start - self._spill_start])
+                for _ in range(start, min(stop, self._spilled_count)):
+                    turns.append(tuple(json.loads(spill_file.readline())))
+        for index in range(max(start, self._spilled_count), stop):
+            turns.append(self._recent[index - self._spilled_count])
+        return turns
+
+    def recent(self, count):
+        return self.turns(len(self) - count, len(self))
+
+
+# Function to delete spill files left by sessions that ended, judged by when they were last written
+def prune_spill_files(spill_dir, max_age):
+    cutoff = time.time() - max_age
+    for path in glob.glob(os.path.join(spill_dir, "chat-*.jsonl")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Another session pruned it first
+            pass
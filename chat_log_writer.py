@@ -0,0 +1,96 @@
+import atexit
+import queue
+import threading
+import time
+import jamai_client
+
+_STOP = object()
+
+
+class ChatLogWriter:
+    """
+    Background writer that batches chat exchanges into as few
+    /gen_tables/chat/rows/add calls as possible, off the request path.
+
+    A batch is sent once it holds `max_batch` rows or its oldest row has waited
+    `flush_interval` seconds, and whatever is queued is flushed at shutdown.
+    Failed rows are retried with backoff up to `max_retries` times.
+    """
+
+    def __init__(self, table_id, token=None, max_batch=20, flush_interval=2.0, max_retries=3, max_queue=1000):
+        self.table_id = table_id
+        self.token = token
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, user_input, ai_response):
+        """
+        Queue one exchange without blocking. Returns False if the queue is full and the exchange was dropped.
+        """
+        try:
+            self._queue.put_nowait({"User": user_input, "AI": ai_response})
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=10.0):
+        """
+        Flush everything queued and stop the writer thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        batch_started = None
+        while True:
+            wait = None if not batch else max(0.0, batch_started + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                # Drain anything queued behind the stop marker before exiting
+                while True:
+                    try:
+                        pending = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is not _STOP:
+                        batch.append(pending)
+                if batch:
+                    self._send(batch)
+                return
+
+            if item is not None:
+                if not batch:
+                    batch_started = time.monotonic()
+                batch.append(item)
+            if batch and (len(batch) >= self.max_batch or time.monotonic() - batch_started >= self.flush_interval):
+                self._send(batch)
+                batch = []
+
+    def _send(self, rows):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 10.0))
+            results = jamai_client.add_rows("chat", self.table_id, rows, chunk_size=self.max_batch, token=self.token)
+            failed_rows = [row for row, error in results if error is not None]
+            self.sent += len(rows) - len(failed_rows)
+            if not failed_rows:
+                return
+            self.last_error = next(error for _, error in results if error is not None)
+            rows = failed_rows
+        self.failed += len(rows)
@@ -0,0 +1,279 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Environment Variables
+JAMAI_PAT = os.getenv("JAMAI_PAT")
+PROJECT_ID = os.getenv("PROJECT_ID")
+BASE_URL = os.getenv("BASE_URL")
+
+# Most rows the add endpoint accepts in one request
+MAX_ADD_ROWS = int(os.getenv("JAMAI_MAX_ADD_ROWS", "100"))
+
+# Bulk delete settings: rows per request, parallel requests and retries per chunk
+MAX_DELETE_ROWS = int(os.getenv("JAMAI_MAX_DELETE_ROWS", "100"))
+DELETE_WORKERS = int(os.getenv("JAMAI_DELETE_WORKERS", "4"))
+DELETE_RETRIES = int(os.getenv("JAMAI_DELETE_RETRIES", "2"))
+
+# HOME's background loader threads: room for the three reads of each concurrently loading session, unless set explicitly
+LOADER_THREADS = int(os.getenv("HOME_LOADER_THREADS", str(int(os.getenv("HOME_CONCURRENT_SESSIONS", "8")) * 3)))
+
+# Connection pool settings (one pool per host, shared by every page and session).
+# The pool holds a connection for every thread that can call JamAI at once (the loaders plus the delete workers);
+# a smaller pool discards connections under that load and pays a new TLS handshake for each.
+POOL_CONNECTIONS = int(os.getenv("JAMAI_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("JAMAI_POOL_MAXSIZE", str(LOADER_THREADS + DELETE_WORKERS)))
+
+# Default (connect, read) timeouts in seconds
+CONNECT_TIMEOUT = float(os.getenv("JAMAI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("JAMAI_READ_TIMEOUT", "30"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# Function to build the API headers for a given token
+def build_headers(token=None):
+    """
+    Build JamAI request headers. Defaults to the personal access token.
+    """
+    return {
+        "Authorization": f"Bearer {token or JAMAI_PAT}",
+        "X-PROJECT-ID": PROJECT_ID,
+        "Content-Type": "application/json",
+        "Accept": "application/json"
+    }
+
+
+# Function to get the process-wide pooled session
+def get_session():
+    """
+    Return the shared keep-alive session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+# Function to build a full API URL from a path
+def api_url(path):
+    return f"{BASE_URL}/api/v1/{path.lstrip('/')}"
+
+
+# Function to label a request path with table and row IDs replaced, so metrics group by endpoint
+def endpoint_label(path):
+    parts = path.strip("/").split("?")[0].split("/")
+    if parts[0] == "gen_tables" and len(parts) > 2 and parts[2] != "rows":
+        parts[2] = "{table}"
+        if len(parts) > 4 and parts[3] == "rows":
+            parts[4] = "{row_id}"
+    return "/".join(parts)
+
+
+# Function to send a request through the pooled session
+def request(method, path, token=None, **kwargs):
+    """
+    Send a request to the JamAI API with the shared session and default timeouts.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    headers = build_headers(token)
+    headers.update(kwargs.pop("headers", None) or {})
+    if not metrics.ENABLED:
+        return get_session().request(method, api_url(path), headers=headers, **kwargs)
+
+    endpoint = endpoint_label(path)
+    if kwargs.get("json") is not None:
+        metrics.observe("jamai_request_bytes", len(json.dumps(kwargs["json"])), metrics.SIZE_BUCKETS, endpoint=endpoint)
+    started = time.perf_counter()
+    try:
+        response = get_session().request(method, api_url(path), headers=headers, **kwargs)
+    except requests.RequestException as err:
+        metrics.count("jamai_requests_total", method=method, endpoint=endpoint, status=type(err).__name__)
+        raise
+    # Streamed responses are timed to their headers; their body size is only known from Content-Length
+    metrics.observe("jamai_request_seconds", time.perf_counter() - started, method=method, endpoint=endpoint)
+    metrics.count("jamai_requests_total", method=method, endpoint=endpoint, status=response.status_code)
+    response_bytes = response.headers.get("Content-Length")
+    if response_bytes is None and not kwargs.get("stream"):
+        response_bytes = len(response.content)
+    if response_bytes is not None:
+        metrics.observe("jamai_response_bytes", int(response_bytes), metrics.SIZE_BUCKETS, endpoint=endpoint)
+    return response
+
+
+def get(path, token=None, **kwargs):
+    return request("GET", path, token=token, **kwargs)
+
+
+def post(path, token=None, **kwargs):
+    return request("POST", path, token=token, **kwargs)
+
+
+# Largest page the rows endpoint will return in one call
+MAX_PAGE_SIZE = 100
+
+
+# Function to cap the default timeouts at the time left before a time.monotonic() deadline
+def remaining_timeout(deadline=None):
+    if deadline is None:
+        return DEFAULT_TIMEOUT
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout("The deadline passed before the request was sent")
+    return min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining)
+
+
+# Function to lazily walk the rows of a generative table
+def iter_rows(table_type, table_id, page_size=MAX_PAGE_SIZE, search_query=None, columns=None, token=None,
+              deadline=None):
+    """
+    Yield rows page by page using offset/limit, holding at most one page in memory.
+    Raises requests.HTTPError if a page cannot be fetched. With a time.monotonic()
+    `deadline`, each page request only gets the time left and requests.Timeout is
+    raised once it has passed.
+    """
+    offset = 0
+    while True:
+        params = {"offset": offset, "limit": page_size}
+        if search_query:
+            params["search_query"] = search_query
+        if columns:
+            params["columns"] = columns
+        response = get(f"gen_tables/{table_type}/{table_id}/rows", token=token, params=params,
+                       timeout=remaining_timeout(deadline))
+        response.raise_for_status()
+        body = response.json()
+        items = body.get("items", [])
+        yield from items
+
+        offset += len(items)
+        total = body.get("total")
+        if len(items) < page_size or (total is not None and offset >= total):
+            return
+
+
+# Function to lazily walk only the rows whose columns equal the given values
+def iter_matching_rows(table_type, table_id, filters, **kwargs):
+    """
+    Yield rows where every column in `filters` has the given value.
+    The first filter is pushed to the server as an anchored search query,
+    and all filters are re-checked locally since the search spans every column.
+    """
+    filters = {column: str(value) for column, value in filters.items() if value is not None}
+    if filters:
+        kwargs.setdefault("search_query", f"^{re.escape(next(iter(filters.values())))}$")
+    for row in iter_rows(table_type, table_id, **kwargs):
+        if all(str(row.get(column, {}).get("value", "")) == value for column, value in filters.items()):
+            yield row
+
+
+# Function to add many rows with as few requests as possible
+def add_rows(table_type, table_id, rows, chunk_size=MAX_ADD_ROWS, token=None):
+    """
+    Add rows to a table, sending up to `chunk_size` rows per request.
+    Returns one (row, error) pair per input row, where error is None on success.
+    """
+    results = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        payload = {"data": chunk, "table_id": table_id}
+        try:
+            response = post(f"gen_tables/{table_type}/rows/add", token=token, json=payload)
+            error = None if response.status_code == 200 else f"Error {response.status_code}: {response.text}"
+        except requests.RequestException as err:
+            error = str(err)
+        results.extend((row, error) for row in chunk)
+    return results
+
+
+# Function to delete one chunk of rows, retrying with backoff on failure
+def _delete_chunk(table_type, table_id, row_ids, retries, token):
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(0.5 * 2 ** (attempt - 1))
+        try:
+            payload = {"table_id": table_id, "row_ids": row_ids}
+            response = post(f"gen_tables/{table_type}/rows/delete", token=token, json=payload)
+            if response.status_code == 200:
+                return None
+            error = f"Error {response.status_code}: {response.text}"
+            # Client errors will not succeed on retry
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                return error
+        except requests.RequestException as err:
+            error = str(err)
+    return error
+
+
+# Function to delete many rows over a small worker pool
+def delete_rows(table_type, table_id, row_ids, chunk_size=MAX_DELETE_ROWS, max_workers=DELETE_WORKERS,
+                retries=DELETE_RETRIES, on_progress=None, token=None):
+    """
+    Delete rows in bounded chunks sent concurrently, retrying failed chunks.
+    A failed chunk does not stop the others, so the result may be a partial success.
+    `on_progress(done_rows, total_rows)` is called from the calling thread as chunks finish.
+    Returns (deleted_ids, failures) where failures is a list of (row_ids, error).
+    """
+    row_ids = list(row_ids)
+    chunks = [row_ids[start:start + chunk_size] for start in range(0, len(row_ids), chunk_size)]
+    deleted_ids, failures = [], []
+    done_rows = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = {
+            executor.submit(_delete_chunk, table_type, table_id, chunk, retries, token): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            error = future.result()
+            if error is None:
+                deleted_ids.extend(chunk)
+            else:
+                failures.append((chunk, error))
+            done_rows += len(chunk)
+            if on_progress is not None:
+                on_progress(done_rows, len(row_ids))
+    return deleted_ids, failures
+
+
+# Function to parse a streamed chat completion into content deltas
+def iter_chat_deltas(response):
+    """
+    Yield each content delta from a server-sent-events chat completion as it arrives.
+    """
+    for chunk in response.iter_lines():
+        if not chunk:
+            continue
+        chunk_data = chunk.decode("utf-8")
+        if not chunk_data.startswith("data: "):
+            continue
+        chunk_data = chunk_data[6:]
+        if chunk_data.strip() == "[DONE]":
+            return
+        try:
+            json_data = json.loads(chunk_data)
+        except json.JSONDecodeError:
+            continue
+        if json_data.get("choices"):
+            content = json_data["choices"][0].get("delta", {}).get("content")
+            if content:
+                yield content
@@ -0,0 +1,81 @@
+from bisect import bisect_right
+
+
+class TipIndex:
+    """
+    Productivity tips compiled into sorted, non-overlapping [start, end) task-count
+    ranges, so a lookup is a single bisect.
+    """
+
+    def __init__(self, starts, ends, tips, row_count, rejected):
+        self.starts = starts
+        self.ends = ends
+        self.tips = tips
+        self.row_count = row_count
+        # (task_count value, reason) for rows skipped at compile time
+        self.rejected = rejected
+
+    def lookup(self, task_count):
+        """
+        Return the tip for `task_count`, or None if no range covers it.
+        """
+        index = bisect_right(self.starts, task_count) - 1
+        if index >= 0 and task_count < self.ends[index]:
+            return self.tips[index]
+        return None
+
+
+def parse_task_count(value):
+    """
+    Parse a task_count cell into a half-open range: "3" is [3, 4) and "3-5" is
+    [3, 5), matching range(3, 5). Raises ValueError for anything else.
+    """
+    text = str(value).strip()
+    low, separator, high = text.partition("-")
+    try:
+        start = int(low)
+        end = int(high) if separator else start + 1
+    except ValueError:
+        raise ValueError(f"'{text}' is not a count or a start-end range")
+    if start < 0 or end <= start:
+        raise ValueError(f"'{text}' is an empty or negative range")
+    return start, end
+
+
+def compile_tips(rows):
+    """
+    Compile raw productivity_tips rows into a TipIndex. Where ranges overlap the
+    row listed first wins, as it did with the old top-to-bottom scan.
+    """
+    intervals = []
+    rejected = []
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        raw_count = row.get("task_count", {}).get("value", "")
+        try:
+            start, end = parse_task_count(raw_count)
+        except ValueError as err:
+            rejected.append((raw_count, str(err)))
+            continue
+        tip = row.get("motivation", {}).get("value", "Motivational text not found.")
+        intervals.append((start, end, tip))
+
+    # Split the number line at every boundary and give each piece to the first row covering it
+    boundaries = sorted({point for start, end, _ in intervals for point in (start, end)})
+    owners = [None] * len(boundaries)
+    for start, end, tip in reversed(intervals):
+        for piece in range(bisect_right(boundaries, start) - 1, bisect_right(boundaries, end) - 1):
+            owners[piece] = tip
+
+    starts, ends, tips = [], [], []
+    for piece, tip in enumerate(owners[:-1]):
+        if tip is None:
+            continue
+        if ends and ends[-1] == boundaries[piece] and tips[-1] is tip:
+            ends[-1] = boundaries[piece + 1]
+        else:
+            starts.append(boundaries[piece])
+            ends.append(boundaries[piece + 1])
+            tips.append(tip)
+    return TipIndex(starts, ends, tips, row_count, rejected)
@@ -0,0 +1,140 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import requests
+
+_STOP = object()
+
+
+class PlyerBackend:
+    """
+    Desktop notification through plyer, imported on first use so a server without it still starts.
+    """
+
+    name = "plyer"
+
+    def __init__(self, app_name="Pomodoro Timer", display_seconds=5):
+        self.app_name = app_name
+        self.display_seconds = display_seconds
+
+    def __call__(self, title, message):
+        from plyer import notification
+        notification.notify(title=title, message=message, app_name=self.app_name, timeout=self.display_seconds)
+
+
+class WebhookBackend:
+    """
+    POST each notification as JSON to a URL, e.g. a chat or push gateway.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, title, message):
+        response = requests.post(self.url, json={"title": title, "message": message}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class NoopBackend:
+    name = "noop"
+
+    def __call__(self, title, message):
+        pass
+
+
+class Notifier:
+    """
+    Deliver notifications from a background worker so callers never block.
+
+    `notify()` only puts the event on a bounded queue; the worker hands it to
+    every backend with a per-delivery timeout. Drops, failures and timeouts
+    are counted and the last error kept, instead of being raised to the caller.
+    """
+
+    def __init__(self, backends, max_queue=100, timeout=5.0):
+        self.backends = list(backends)
+        self.timeout = timeout
+        self.delivered = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.dropped = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        # A backend that hangs keeps one of these threads; the worker itself moves on after `timeout`
+        self._executor = ThreadPoolExecutor(max_workers=max(2, len(self.backends)), thread_name_prefix="notifier-backend")
+        self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def notify(self, title, message):
+        """
+        Queue a notification without blocking. Returns False if the queue is full and it was dropped.
+        """
+        try:
+            self._queue.put_nowait((title, message))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+        }
+
+    def close(self, timeout=5.0):
+        """
+        Deliver what is already queued, then stop the worker.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            title, message = item
+            for backend in self.backends:
+                self._deliver(backend, title, message)
+
+    def _deliver(self, backend, title, message):
+        future = self._executor.submit(backend, title, message)
+        try:
+            future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.timed_out += 1
+            self.last_error = f"{backend.name}: no response after {self.timeout:g}s"
+        except Exception as err:
+            self.failed += 1
+            self.last_error = f"{backend.name}: {err}"
+        else:
+            self.delivered += 1
+
+
+# Function to build backends from names such as "plyer,webhook"; "toast" is shown by the page itself
+def create_backends(names, webhook_url=None):
+    backends = []
+    for name in names:
+        if name == "plyer":
+            backends.append(PlyerBackend())
+        elif name == "webhook":
+            if not webhook_url:
+                raise ValueError("The webhook notifier needs a URL")
+            backends.append(WebhookBackend(webhook_url))
+        elif name == "noop":
+            backends.append(NoopBackend())
+        elif name != "toast":
+            raise ValueError(f"Unknown notifier '{name}'")
+    return backends
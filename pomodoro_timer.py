@@ -0,0 +1,112 @@
+import math
+import time
+
+WORK = "Work"
+SHORT_BREAK = "Short Break"
+LONG_BREAK = "Long Break"
+COMPLETED = "Completed"
+
+
+class PomodoroTimer:
+    """
+    Pomodoro state machine driven by a monotonic deadline instead of a
+    per-second counter, so nothing has to run between refreshes.
+
+    Remaining time is computed on demand from the deadline and `advance()`
+    applies any phase changes that are due. Each new phase is timed from the
+    previous deadline, so a late refresh never adds drift.
+    """
+
+    def __init__(self, work_seconds, short_break_seconds, long_break_seconds, cycles, clock=time.monotonic):
+        self.clock = clock
+        self.mode = WORK
+        self.cycle_count = 0
+        self.running = False
+        self._deadline = None
+        # Seconds left while paused or stopped
+        self._remaining = 0.0
+        self.configure(work_seconds, short_break_seconds, long_break_seconds, cycles)
+
+    def configure(self, work_seconds, short_break_seconds, long_break_seconds, cycles):
+        """
+        Update the phase lengths and cycle count; the running phase keeps its deadline.
+        """
+        self.durations = {WORK: work_seconds, SHORT_BREAK: short_break_seconds, LONG_BREAK: long_break_seconds}
+        self.cycles = cycles
+
+    def time_left(self):
+        if self.running:
+            return max(0.0, self._deadline - self.clock())
+        return self._remaining
+
+    def display_time(self):
+        """
+        Remaining time as MM:SS, rounded up so a fresh phase shows its full length.
+        """
+        mins, secs = divmod(math.ceil(self.time_left()), 60)
+        return f"{mins:02d}:{secs:02d}"
+
+    def progress(self):
+        total_time = self.durations.get(self.mode)
+        if not total_time:
+            return 0.0
+        return min(1.0, max(0.0, (total_time - self.time_left()) / total_time))
+
+    def start(self):
+        if self.running:
+            return
+        if self._remaining <= 0:
+            self.mode = WORK
+            self._remaining = self.durations[WORK]
+        self.running = True
+        self._deadline = self.clock() + self._remaining
+
+    def pause(self):
+        if not self.running:
+            return
+        self._remaining = self.time_left()
+        self.running = False
+        self._deadline = None
+
+    def reset(self):
+        self.running = False
+        self._deadline = None
+        self.mode = WORK
+        self.cycle_count = 0
+        self._remaining = self.durations[WORK]
+
+    def advance(self):
+        """
+        Apply every phase change whose deadline has passed and return their
+        messages, oldest first. Several phases can end at once after the page
+        has been away for a while.
+        """
+        messages = []
+        while self.running and self.clock() >= self._deadline:
+            messages.extend(self._next_phase())
+        return messages
+
+    def _next_phase(self):
+        if self.mode == WORK:
+            self.cycle_count += 1
+            messages = ["Work session complete! Time for a break."]
+            if self.cycle_count % self.cycles == 0:
+                self._begin(LONG_BREAK)
+                messages.append("Starting Long Break!")
+            elif self.cycle_count < self.cycles:
+                self._begin(SHORT_BREAK)
+                messages.append("Starting Short Break!")
+            else:
+                # End after the last work cycle
+                self.running = False
+                self.mode = COMPLETED
+                self._deadline = None
+                self._remaining = 0.0
+                messages.append("Pomodoro session complete! Great job!")
+            return messages
+        self._begin(WORK)
+        return ["Break over! Back to work."]
+
+    def _begin(self, mode):
+        self.mode = mode
+        self._deadline += self.durations[mode]
@@ -0,0 +1,163 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    answer TEXT NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+# Expired rows are deleted from the SQLite tier once every this many puts
+DISK_PRUNE_EVERY = 100
+
+
+def normalize_query(query):
+    """
+    Lowercase, drop punctuation and collapse whitespace so trivial variations share a key.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def similarity(first, second):
+    """
+    Jaccard similarity of two normalized queries' character trigrams, from 0 to 1.
+    """
+    first_grams, second_grams = _trigrams(first), _trigrams(second)
+    if not first_grams or not second_grams:
+        return 0.0
+    return len(first_grams & second_grams) / len(first_grams | second_grams)
+
+
+class ResponseCache:
+    """
+    LRU cache of chatbot answers keyed on the normalized query, model, k,
+    knowledge table and a caller-chosen context fingerprint ("" for none), with a TTL, an optional SQLite tier that outlives the
+    process and hit/miss counters.
+
+    With `similarity_threshold` set, a miss falls back to the most similar
+    cached query for the same model, k, table and context, so paraphrases hit too.
+
+    Expired SQLite rows are deleted when the cache opens and every DISK_PRUNE_EVERY puts.
+    """
+
+    def __init__(self, capacity=256, ttl=3600, disk_path=None, similarity_threshold=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # (query, model, k, table, context) -> (expires_at, answer)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._puts_since_prune = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(_SCHEMA)
+            self._prune_disk(time.time())
+
+    def get(self, query, model, k, knowledge_table_id, context=""):
+        """
+        Return the cached answer, or None on a miss.
+        """
+        key = (normalize_query(query), model, k, knowledge_table_id, context)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+            answer = self._get_from_disk(key, now)
+            if answer is not None:
+                self.disk_hits += 1
+                return answer
+
+            if self.similarity_threshold is not None:
+                answer = self._get_similar(key, now)
+                if answer is not None:
+                    self.near_hits += 1
+                    return answer
+
+            self.misses += 1
+            return None
+
+    def put(self, query, model, k, knowledge_table_id, answer, context=""):
+        key = (normalize_query(query), model, k, knowledge_table_id, context)
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._store(key, expires_at, answer)
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO responses (cache_key, answer, expires_at) VALUES (?, ?, ?)",
+                        (json.dumps(key), answer, expires_at),
+                    )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= DISK_PRUNE_EVERY:
+                    self._prune_disk(now)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key, expires_at, answer):
+        self._entries[key] = (expires_at, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _prune_disk(self, now):
+        with self._disk:
+            self._disk.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._puts_since_prune = 0
+
+    def _get_from_disk(self, key, now):
+        if self._disk is None:
+            return None
+        row = self._disk.execute(
+            "SELECT answer, expires_at FROM responses WHERE cache_key = ?", (json.dumps(key),)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        # Promote to memory so the next lookup skips the disk
+        self._store(key, row[1], row[0])
+        return row[0]
+
+    def _get_similar(self, key, now):
+        query, *scope = key
+        best_key, best_score = None, self.similarity_threshold
+        for cached_key, (expires_at, _) in self._entries.items():
+            if expires_at <= now or list(cached_key[1:]) != scope:
+                continue
+            score = similarity(query, cached_key[0])
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
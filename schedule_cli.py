@@ -0,0 +1,190 @@
+"""
+Schedule tasks offline, one day per owner, without the Streamlit pages.
+
+Tasks are streamed from JSON Lines, CSV, a JSON Lines dump of JamAI rows or
+the task table itself, partitioned by (task_date, owner) into temporary files
+and scheduled partition by partition in a process pool. Each worker writes
+its own part of the output, so memory stays bounded by the largest partition.
+Meal times are always blocked out, as in the app.
+
+Usage:
+    python schedule_cli.py tasks.jsonl --output schedules.jsonl
+    python schedule_cli.py tasks.csv --output schedules.csv --workers 8
+    python schedule_cli.py rows_dump.jsonl --format rows --output schedules.jsonl
+    python schedule_cli.py --table "$TASK_TABLE_ID" --output schedules.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import scheduler
+import task_import
+
+OUTPUT_COLUMNS = ["owner", "task_date", "task_name", "priority", "estimated_time", "scheduled_time"]
+DEFAULT_PARTITIONS = 64
+# Invalid records reported individually before only being counted
+MAX_REPORTED_ERRORS = 10
+
+
+def _row_to_record(row):
+    return {column: cell.get("value") if isinstance(cell, dict) else cell for column, cell in row.items()}
+
+
+def iter_records(path=None, input_format="auto", table_id=None):
+    """
+    Yield (line, record) pairs one at a time from a file or, with `table_id`, the JamAI table.
+    """
+    if table_id:
+        import jamai_client
+        for line, row in enumerate(jamai_client.iter_rows("action", table_id), start=1):
+            yield line, _row_to_record(row)
+        return
+
+    file_format = None if input_format == "auto" else "csv" if input_format == "csv" else "json"
+    with open(path, encoding="utf-8-sig", newline="") as input_file:
+        for line, record in task_import.iter_task_records(path, input_file, file_format):
+            yield line, _row_to_record(record) if input_format == "rows" and isinstance(record, dict) else record
+
+
+def partition_records(records, directory, partitions):
+    """
+    Validate records and append them to one of `partitions` JSON Lines files by
+    a stable hash of (task_date, owner), so each group lands in a single file.
+    Returns (partition paths, task count, errors, error count): errors holds the
+    first MAX_REPORTED_ERRORS as (line, message), error count includes the rest.
+    """
+    paths = [os.path.join(directory, f"partition-{index:04d}.jsonl") for index in range(partitions)]
+    files = [None] * partitions
+    task_count = 0
+    errors = []
+    error_count = 0
+    try:
+        for line, record in records:
+            try:
+                task = task_import.parse_task_record(record)
+            except ValueError as err:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append((line, str(err)))
+                continue
+            owner = str(record.get("owner") or "").strip()
+            index = zlib.crc32(f"{task['task_date']}\0{owner}".encode("utf-8")) % partitions
+            if files[index] is None:
+                files[index] = open(paths[index], "w", encoding="utf-8")
+            files[index].write(json.dumps([owner, task]) + "\n")
+            task_count += 1
+    finally:
+        for partition_file in files:
+            if partition_file is not None:
+                partition_file.close()
+    return [path for path, partition_file in zip(paths, files) if partition_file is not None], task_count, errors, error_count
+
+
+def schedule_partition(path, output_format):
+    """
+    Schedule every (task_date, owner) group in one partition file and write the
+    results next to it. Returns (result path, tasks, groups, unscheduled tasks).
+    """
+    groups = {}
+    with open(path, encoding="utf-8") as partition_file:
+        for raw in partition_file:
+            owner, task = json.loads(raw)
+            groups.setdefault((task["task_date"], owner), []).append(task)
+
+    result_path = path + ".out"
+    task_count = unscheduled = 0
+    with open(result_path, "w", encoding="utf-8", newline="") as result_file:
+        writer = csv.DictWriter(result_file, fieldnames=OUTPUT_COLUMNS, extrasaction="ignore")
+        for (task_date, owner), tasks in sorted(groups.items()):
+            task_count += len(tasks)
+            # calculate_schedule inserts the meal blocks and stamps scheduled_time on the tasks that fit
+            scheduled = scheduler.calculate_schedule(tasks)
+            unscheduled += sum(1 for task in tasks if "scheduled_time" not in task)
+            for entry in scheduled:
+                record = dict(entry, owner=owner, task_date=task_date)
+                if output_format == "csv":
+                    writer.writerow(record)
+                else:
+                    result_file.write(json.dumps(record) + "\n")
+    os.remove(path)
+    return result_path, task_count, len(groups), unscheduled
+
+
+def run(paths, output_path, output_format, workers):
+    """
+    Schedule the partitions, at most `workers` in flight, appending each
+    finished part to the output. Returns (tasks, groups, unscheduled).
+    """
+    totals = [0, 0, 0]
+
+    def collect(result):
+        result_path, *counts = result
+        with open(result_path, encoding="utf-8", newline="") as part:
+            shutil.copyfileobj(part, output_file)
+        os.remove(result_path)
+        for index, value in enumerate(counts):
+            totals[index] += value
+
+    with open(output_path, "w", encoding="utf-8", newline="") as output_file:
+        if output_format == "csv":
+            csv.writer(output_file).writerow(OUTPUT_COLUMNS)
+        if workers <= 1:
+            for path in paths:
+                collect(schedule_partition(path, output_format))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for path in paths:
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future.result())
+                    pending.add(pool.submit(schedule_partition, path, output_format))
+                for future in wait(pending).done:
+                    collect(future.result())
+    return tuple(totals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schedule tasks offline, one day per owner.")
+    parser.add_argument("input", nargs="?", help="JSON Lines or CSV task file (omit with --table)")
+    parser.add_argument("--format", dest="input_format", choices=["auto", "jsonl", "csv", "rows"], default="auto",
+                        help="Input format; 'rows' is a JSON Lines dump of JamAI table rows")
+    parser.add_argument("--table", help="Read tasks from this JamAI action table instead of a file")
+    parser.add_argument("--output", required=True, help="Write schedules here (.csv for CSV, otherwise JSON Lines)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS,
+                        help="Temporary partition files; more partitions means less memory per worker")
+    parser.add_argument("--work-dir", help="Directory for temporary partition files")
+    args = parser.parse_args(argv)
+    if not args.input and not args.table:
+        parser.error("give an input file or --table")
+
+    output_format = "csv" if args.output.lower().endswith(".csv") else "jsonl"
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="schedule-cli-", dir=args.work_dir) as directory:
+        records = iter_records(args.input, args.input_format, args.table)
+        paths, task_count, errors, error_count = partition_records(records, directory, args.partitions)
+        read_seconds = time.perf_counter() - started
+        tasks, groups, unscheduled = run(paths, args.output, output_format, args.workers)
+    elapsed = time.perf_counter() - started
+
+    for line, message in errors:
+        print(f"Skipped line {line}: {message}", file=sys.stderr)
+    if error_count > len(errors):
+        print(f"... and {error_count - len(errors):,} more invalid records", file=sys.stderr)
+    print(f"Scheduled {tasks:,} tasks in {groups:,} day schedules ({unscheduled:,} did not fit the day) "
+          f"in {elapsed:.2f}s: {tasks / elapsed if elapsed > 0 else 0:,.0f} tasks/s "
+          f"(reading and partitioning took {read_seconds:.2f}s)", file=sys.stderr)
+    return 0 if task_count or not error_count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
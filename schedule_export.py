@@ -0,0 +1,172 @@
+import csv
+import datetime
+import io
+import re
+
+EXPORT_COLUMNS = ["id", "task_name", "priority", "estimated_time", "scheduled_time", "task_date"]
+CHUNK_ROWS = 1000
+
+# Format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "iCalendar": ("ics", "text/calendar"),
+}
+
+_RANGE = re.compile(r"\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})")
+
+
+# Function to check whether the optional pyarrow dependency is installed
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_formats():
+    return [name for name in FORMATS if name != "Parquet" or parquet_available()]
+
+
+def iter_csv(tasks, chunk_rows=CHUNK_ROWS):
+    """
+    Yield the tasks as CSV text, `chunk_rows` rows per chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for count, task in enumerate(tasks, start=1):
+        writer.writerow(task)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_parquet(tasks, sink, chunk_rows=CHUNK_ROWS):
+    """
+    Write the tasks as Parquet to a path or binary file object, one row group per `chunk_rows` tasks. Needs pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("task_name", pa.string()),
+        ("priority", pa.string()),
+        ("estimated_time", pa.float64()),
+        ("scheduled_time", pa.string()),
+        ("task_date", pa.string()),
+    ])
+    with pq.ParquetWriter(sink, schema) as writer:
+        chunk = []
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) == chunk_rows:
+                writer.write_table(_arrow_table(pa, schema, chunk))
+                chunk = []
+        if chunk:
+            writer.write_table(_arrow_table(pa, schema, chunk))
+
+
+def _arrow_table(pa, schema, tasks):
+    columns = {name: [task.get(name) for task in tasks] for name in schema.names}
+    columns["estimated_time"] = [_to_float(value) for value in columns["estimated_time"]]
+    columns["id"] = [None if value is None else str(value) for value in columns["id"]]
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_time_range(task_date, scheduled_time):
+    """
+    Return (start, end) datetimes for a task's "HH:MM-HH:MM" slot on its date, or
+    None if either is missing or malformed. An end at or before the start runs
+    into the next day.
+    """
+    match = _RANGE.match(scheduled_time) if isinstance(scheduled_time, str) else None
+    if match is None:
+        return None
+    try:
+        day = datetime.datetime.strptime(str(task_date), "%Y-%m-%d")
+    except ValueError:
+        return None
+    start_hours, start_minutes, end_hours, end_minutes = (int(part) for part in match.groups())
+    start = day + datetime.timedelta(hours=start_hours, minutes=start_minutes)
+    end = day + datetime.timedelta(hours=end_hours, minutes=end_minutes)
+    if end <= start:
+        end += datetime.timedelta(days=1)
+    return start, end
+
+
+def _ics_text(value):
+    return (str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _ics_line(line):
+    # Lines longer than 75 octets are folded onto continuation lines starting with a space
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(tasks, calendar_name="My Schedule"):
+    """
+    Yield an iCalendar feed with one event per task that has a scheduled time
+    range; unscheduled tasks are skipped. Times are floating local times.
+    """
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "".join(_ics_line(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//ProductivityManager//My Schedule//EN",
+        f"X-WR-CALNAME:{_ics_text(calendar_name)}",
+    ))
+    for number, task in enumerate(tasks):
+        slot = parse_time_range(task.get("task_date"), task.get("scheduled_time"))
+        if slot is None:
+            continue
+        start, end = slot
+        yield "".join(_ics_line(line) for line in (
+            "BEGIN:VEVENT",
+            f"UID:{task.get('id') or f'{start:%Y%m%dT%H%M%S}-{number}'}@productivity-manager",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start:%Y%m%dT%H%M%S}",
+            f"DTEND:{end:%Y%m%dT%H%M%S}",
+            f"SUMMARY:{_ics_text(task.get('task_name', ''))}",
+            f"CATEGORIES:{_ics_text(task.get('priority', ''))}",
+            "END:VEVENT",
+        ))
+    yield _ics_line("END:VCALENDAR")
+
+
+def export_bytes(tasks, export_format):
+    """
+    Return the tasks encoded in `export_format`. The whole export is held in memory,
+    as Streamlit's download button needs it that way anyway.
+    """
+    if export_format == "Parquet":
+        buffer = io.BytesIO()
+        write_parquet(tasks, buffer)
+        return buffer.getvalue()
+    chunks = iter_csv(tasks) if export_format == "CSV" else iter_ics(tasks)
+    return "".join(chunks).encode("utf-8")
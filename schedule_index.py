@@ -0,0 +1,69 @@
+import re
+from bisect import bisect_left, bisect_right
+import pandas as pd
+
+PRIORITY_LABELS = {"High": "🔴 High", "Medium": "🟡 Medium", "Low": "🟢 Low", "Meal": "🍴 Meal"}
+
+_CLOCK = re.compile(r"\s*(\d{1,2}):(\d{2})")
+# Sorts after every real time of day
+_UNSCHEDULED = 24 * 60
+
+
+def time_of_day(scheduled_time):
+    """
+    Minutes after midnight of a "HH:MM-HH:MM" (or "H:MM-...") scheduled_time,
+    for sorting; anything without a leading time, like "Not Scheduled", sorts last.
+    """
+    match = _CLOCK.match(scheduled_time) if isinstance(scheduled_time, str) else None
+    if match is None:
+        return _UNSCHEDULED
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+class ScheduleIndex:
+    """
+    Fetched tasks grouped by task_date once per fetch, with the dates kept sorted
+    and each date's tasks sorted by time of day. Display DataFrames are built on
+    first use and cached, so switching dates does no regrouping or re-sorting.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        by_date = {}
+        for task in tasks:
+            by_date.setdefault(task["task_date"], []).append(task)
+        for date_tasks in by_date.values():
+            date_tasks.sort(key=lambda task: time_of_day(task["scheduled_time"]))
+        self._by_date = by_date
+        self.dates = sorted(by_date)
+        self._frames = {}
+
+    def __bool__(self):
+        return bool(self.tasks)
+
+    def tasks_on(self, task_date):
+        return self._by_date.get(task_date, [])
+
+    def tasks_between(self, start_date, end_date):
+        """
+        Tasks dated from start_date to end_date inclusive, in date then time order.
+        """
+        first = bisect_left(self.dates, start_date)
+        last = bisect_right(self.dates, end_date)
+        return [task for task_date in self.dates[first:last] for task in self._by_date[task_date]]
+
+    def all_tasks(self):
+        return self.tasks_between(self.dates[0], self.dates[-1]) if self.dates else []
+
+    def frame(self, task_date=None):
+        """
+        Sorted display DataFrame for one date, or every date when task_date is None,
+        with priority labels applied. Treat it as read-only; it is shared between reruns.
+        """
+        if task_date not in self._frames:
+            tasks = self.all_tasks() if task_date is None else self.tasks_on(task_date)
+            tasks_df = pd.DataFrame(tasks)
+            if not tasks_df.empty:
+                tasks_df["priority"] = tasks_df["priority"].replace(PRIORITY_LABELS)
+            self._frames[task_date] = tasks_df
+        return self._frames[task_date]
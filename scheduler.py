@@ -1,4 +1,7 @@
-from datetime import datetime, timedelta
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+import metrics
 
 # Reserved meal times
 MEAL_TIMES = {
@@ -7,60 +10,116 @@ MEAL_TIMES = {
     "Dinner": ("19:00", "20:00"),
 }
 
-def calculate_schedule(tasks):
+# Sort order for task priorities (High > Medium > Low)
+PRIORITY_ORDER = {"High": 1, "Medium": 2, "Low": 3}
+
+# Value of one scheduled hour per priority, used by the packing mode
+PRIORITY_WEIGHTS = {"High": 3, "Medium": 2, "Low": 1}
+
+MINUTES_PER_DAY = 24 * 60
+
+# Precomputed "HH:MM" labels for every minute of the day
+_CLOCK_LABELS = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(MINUTES_PER_DAY + 1)]
+
+
+def to_minutes(clock):
+    """
+    Convert an "HH:MM" string to minutes after midnight.
+    """
+    hours, minutes = clock.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minute):
+    """
+    Convert minutes after midnight back to an "HH:MM" string.
+    """
+    return _CLOCK_LABELS[minute]
+
+
+def format_range(start, end):
+    return f"{_CLOCK_LABELS[start]}-{_CLOCK_LABELS[end]}"
+
+
+def duration_minutes(hours):
+    """
+    Convert an estimated time in hours to whole minutes.
+    """
+    return round(hours * 60)
+
+
+def build_timeline(blocks):
+    """
+    Parse fixed blocks ({name: ("HH:MM", "HH:MM")}) once into a sorted timeline
+    of parallel (starts, ends, names) lists for bisect lookups.
+    """
+    intervals = sorted((to_minutes(start), to_minutes(end), name) for name, (start, end) in blocks.items())
+    for (_, previous_end, previous_name), (start, _, name) in zip(intervals, intervals[1:]):
+        if start < previous_end:
+            raise ValueError(f"Blocked times '{previous_name}' and '{name}' overlap")
+    return (
+        [start for start, _, _ in intervals],
+        [end for _, end, _ in intervals],
+        [name for _, _, name in intervals],
+    )
+
+
+# Scheduling window and meal timeline, parsed once at import
+DAY_START = to_minutes("08:00")
+DAY_END = to_minutes("23:00")
+MEAL_TIMELINE = build_timeline(MEAL_TIMES)
+
+
+def _block_entry(name, start, end):
+    hours, remainder = divmod(end - start, 60)
+    return {
+        "task_name": name,
+        "priority": "Meal" if name in MEAL_TIMES else "Blocked",
+        "estimated_time": hours if not remainder else (end - start) / 60,
+        "scheduled_time": format_range(start, end),
+    }
+
+
+@metrics.timed("calculate_schedule")
+def calculate_schedule(tasks, blocks=None):
     """
     Schedule tasks sequentially, considering meal times and priorities.
+    `blocks` overrides the fixed blocks ({name: ("HH:MM", "HH:MM")}), defaulting to MEAL_TIMES.
     """
+    block_starts, block_ends, block_names = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+
     # Sort tasks by priority (High > Medium > Low)
-    priority_order = {"High": 1, "Medium": 2, "Low": 3}
     valid_tasks = sorted(
         tasks,
-        key=lambda x: (priority_order.get(x["priority"], 999), x.get("task_name", "")),
+        key=lambda x: (PRIORITY_ORDER.get(x["priority"], 999), x.get("task_name", "")),
     )
 
-    # Initialize start time and scheduled tasks
-    start_time = datetime.strptime("08:00", "%H:%M")
-    end_of_day = datetime.strptime("23:00", "%H:%M")
+    # Current position on the day's timeline, in minutes after midnight
+    start = DAY_START
     scheduled_tasks = []
 
-    # Helper function to check if the current time is during a meal
-    def is_during_meal(time):
-        for meal, (meal_start, meal_end) in MEAL_TIMES.items():
-            meal_start_time = datetime.strptime(meal_start, "%H:%M")
-            meal_end_time = datetime.strptime(meal_end, "%H:%M")
-            if meal_start_time <= time < meal_end_time:
-                return meal, meal_start_time, meal_end_time
-        return None, None, None
-
     # Iterate through the tasks
     for task in valid_tasks:
+        # Skip past any blocks the current start time falls into
         while True:
-            # Check if the current start time is during a meal
-            meal, meal_start_time, meal_end_time = is_during_meal(start_time)
-            if meal:
-                # Add the meal task and skip the time
-                scheduled_tasks.append({
-                    "task_name": meal,
-                    "priority": "Meal",
-                    "estimated_time": 1,
-                    "scheduled_time": f"{meal_start_time.strftime('%H:%M')}-{meal_end_time.strftime('%H:%M')}",
-                })
-                start_time = meal_end_time  # Move past the meal
-            else:
+            index = bisect_right(block_starts, start) - 1
+            if index < 0 or start >= block_ends[index]:
                 break
+            scheduled_tasks.append(_block_entry(block_names[index], block_starts[index], block_ends[index]))
+            start = block_ends[index]
 
         # Calculate the task's end time
-        task_end_time = start_time + timedelta(hours=task["estimated_time"])
-        if task_end_time > end_of_day:
+        end = start + duration_minutes(task["estimated_time"])
+        if end > DAY_END:
             # Stop scheduling if beyond the end of the day
             break
 
         # Assign scheduled time to the task
-        task["scheduled_time"] = f"{start_time.strftime('%H:%M')}-{task_end_time.strftime('%H:%M')}"
+        task["scheduled_time"] = format_range(start, end)
         scheduled_tasks.append(task)
 
         # Update start time for the next task
-        start_time = task_end_time
+        start = end
 
     return scheduled_tasks
 
@@ -86,3 +145,506 @@ def add_and_schedule_tasks(tasks, meals=None):
 
     # Schedule tasks
     return calculate_schedule(tasks)
+
+
+def free_windows(blocks=None):
+    """
+    Return the (start, end) minute ranges of the scheduling day not covered by fixed blocks.
+    """
+    block_starts, block_ends, _ = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+    windows = []
+    cursor = DAY_START
+    for block_start, block_end in zip(block_starts, block_ends):
+        if block_start > cursor:
+            windows.append((cursor, min(block_start, DAY_END)))
+        cursor = max(cursor, block_end)
+        if cursor >= DAY_END:
+            break
+    if cursor < DAY_END:
+        windows.append((cursor, DAY_END))
+    return [(start, end) for start, end in windows if end > start]
+
+
+class _CapacityTree:
+    """
+    Max segment tree over remaining window capacities, used to find the
+    leftmost window a task fits into in O(log n).
+    """
+
+    def __init__(self, capacities):
+        self.size = 1
+        while self.size < len(capacities):
+            self.size *= 2
+        # Padding leaves are -1 so even zero-length tasks never land on them
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + len(capacities)] = capacities
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def find(self, need, lo=0):
+        """
+        Return the leftmost index >= lo whose capacity is at least `need`, or -1.
+        """
+        return self._find(1, 0, self.size, need, lo)
+
+    def _find(self, node, node_lo, node_hi, need, lo):
+        if node_hi <= lo or self.tree[node] < need:
+            return -1
+        if node_hi - node_lo == 1:
+            return node_lo
+        mid = (node_lo + node_hi) // 2
+        found = self._find(2 * node, node_lo, mid, need, lo)
+        if found < 0:
+            found = self._find(2 * node + 1, mid, node_hi, need, lo)
+        return found
+
+    def update(self, index, capacity):
+        node = index + self.size
+        self.tree[node] = capacity
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+
+def schedule_across_days(tasks, start_date=None, horizon_days=7, blocks=None):
+    """
+    Schedule tasks over several days, carrying work that does not fit forward.
+
+    Days are filled in order. Each day first takes its own tasks by priority,
+    then tasks carried in from earlier days (oldest date first, then priority)
+    go into whatever room is left, so a leftover never takes a slot from a task
+    dated that day. Every task goes into the earliest free window (between
+    fixed blocks) of the day that still has room, so short tasks fill gaps left
+    earlier. Tasks never span a fixed block.
+    Input tasks are not mutated; placed copies get "scheduled_time", the placed
+    "task_date" and, when moved to a later day, "carried_from".
+
+    Returns (schedule, unscheduled) where schedule maps "YYYY-MM-DD" to the
+    day's entries (fixed blocks included) in time order.
+    """
+    start_date = start_date or date.today()
+    windows = free_windows(blocks)
+    block_starts, block_ends, block_names = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+
+    # One bin per free window per day, in chronological order
+    window_count = len(windows)
+    cursors = [start for _ in range(horizon_days) for start, _ in windows]
+    tree = _CapacityTree([end - start for _ in range(horizon_days) for start, end in windows])
+
+    def task_date_of(task):
+        return date.fromisoformat(str(task["task_date"])) if task.get("task_date") else start_date
+
+    def sort_key(task):
+        return (
+            str(task.get("task_date") or start_date),
+            PRIORITY_ORDER.get(task["priority"], 999),
+            task.get("task_name", ""),
+        )
+
+    # Tasks by the first day they may go on; past-dated tasks start on the first day
+    own_tasks = [[] for _ in range(horizon_days)]
+    unscheduled = []
+    for task in sorted(tasks, key=sort_key):
+        first_day = max((task_date_of(task) - start_date).days, 0)
+        if first_day < horizon_days:
+            own_tasks[first_day].append(task)
+        else:
+            unscheduled.append(dict(task))
+
+    placed = [[] for _ in range(horizon_days)]
+    carried = []
+    for day in range(horizon_days):
+        day_end = (day + 1) * window_count
+        leftover = []
+        for task in own_tasks[day] + carried:
+            need = duration_minutes(task["estimated_time"])
+            index = tree.find(need, day * window_count)
+            if index < 0 or index >= day_end:
+                leftover.append(task)
+                continue
+
+            start = cursors[index]
+            cursors[index] = start + need
+            tree.update(index, tree.tree[tree.size + index] - need)
+
+            task_date = task_date_of(task)
+            entry = dict(task, scheduled_time=format_range(start, start + need),
+                         task_date=str(start_date + timedelta(days=day)))
+            if task_date < start_date + timedelta(days=day):
+                entry["carried_from"] = str(task_date)
+            placed[day].append((start, entry))
+        carried = sorted(leftover, key=sort_key)
+    unscheduled.extend(dict(task) for task in carried)
+
+    schedule = {}
+    for day, entries in enumerate(placed):
+        if not entries:
+            continue
+        entries.extend(
+            (block_start, _block_entry(name, block_start, block_end))
+            for block_start, block_end, name in zip(block_starts, block_ends, block_names)
+        )
+        entries.sort(key=lambda item: item[0])
+        schedule[str(start_date + timedelta(days=day))] = [entry for _, entry in entries]
+    return schedule, unscheduled
+
+
+def utilization(scheduled_tasks, blocks=None):
+    """
+    Share of the day's free minutes taken by scheduled (non-meal) tasks.
+    Works on the output of any scheduling mode.
+    """
+    free_minutes = sum(end - start for start, end in free_windows(blocks))
+    busy_minutes = sum(
+        duration_minutes(task["estimated_time"])
+        for task in scheduled_tasks
+        if task.get("priority") not in ("Meal", "Blocked")
+    )
+    return min(busy_minutes / free_minutes, 1.0) if free_minutes else 0.0
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _pack_windows(durations, weights, capacities, time_budget):
+    """
+    Branch and bound over window assignments maximizing sum(weight * minutes).
+    Items must be sorted by weight descending. Returns (assignment, optimal),
+    assignment holding a window index or -1 per item.
+    """
+    item_count = len(durations)
+    deadline = time.perf_counter() + time_budget
+
+    # Prefix sums for the fractional upper bound (items are sorted by value per minute)
+    prefix_minutes, prefix_value = [0], [0]
+    for duration, weight in zip(durations, weights):
+        prefix_minutes.append(prefix_minutes[-1] + duration)
+        prefix_value.append(prefix_value[-1] + duration * weight)
+
+    def upper_bound(first, capacity):
+        last = bisect_right(prefix_minutes, prefix_minutes[first] + capacity) - 1
+        bound = prefix_value[last] - prefix_value[first]
+        if last < item_count:
+            bound += (prefix_minutes[first] + capacity - prefix_minutes[last]) * weights[last]
+        return bound
+
+    # Greedy first-fit as the starting incumbent
+    remaining = list(capacities)
+    assignment = [-1] * item_count
+    for item, duration in enumerate(durations):
+        window = next((window for window, room in enumerate(remaining) if room >= duration), -1)
+        if window >= 0:
+            remaining[window] -= duration
+            assignment[item] = window
+    best = {
+        "value": sum(durations[item] * weights[item] for item in range(item_count) if assignment[item] >= 0),
+        "assignment": assignment,
+    }
+
+    remaining = list(capacities)
+    current = [-1] * item_count
+
+    def search(first, value, capacity):
+        if time.perf_counter() > deadline:
+            raise _BudgetExceeded
+        if value > best["value"]:
+            best["value"], best["assignment"] = value, list(current)
+        for item in range(first, item_count):
+            if value + upper_bound(item, capacity) <= best["value"]:
+                return
+            duration = durations[item]
+            tried = set()
+            for window, room in enumerate(remaining):
+                # Windows with the same room left are interchangeable for the rest of the search
+                if room < duration or room in tried:
+                    continue
+                tried.add(room)
+                remaining[window] -= duration
+                current[item] = window
+                search(item + 1, value + duration * weights[item], capacity - duration)
+                current[item] = -1
+                remaining[window] += duration
+            # Falling through to the next item means leaving this one out
+
+    try:
+        search(0, 0, sum(capacities))
+        optimal = True
+    except _BudgetExceeded:
+        optimal = False
+    return best["assignment"], optimal
+
+
+def pack_and_schedule_tasks(tasks, time_budget=0.05, blocks=None):
+    """
+    Schedule one day's tasks by packing the free windows between fixed blocks,
+    maximizing priority-weighted scheduled hours instead of stopping at the
+    first task that does not fit. The search is exact when it finishes within
+    `time_budget` seconds and otherwise returns the best packing found.
+
+    Input tasks are not mutated. Returns a dict with the time-ordered
+    "schedule" (fixed blocks included), "unscheduled" tasks, "scheduled_hours",
+    "weighted_hours", "utilization" and whether the result is "optimal".
+    """
+    windows = free_windows(blocks)
+    block_starts, block_ends, block_names = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+    largest_window = max((end - start for start, end in windows), default=0)
+
+    candidates, unscheduled = [], []
+    for task in tasks:
+        duration = duration_minutes(task["estimated_time"])
+        if task.get("priority") == "Meal" or not 0 < duration <= largest_window:
+            unscheduled.append(dict(task))
+        else:
+            candidates.append((task, duration))
+    candidates.sort(key=lambda item: (
+        -PRIORITY_WEIGHTS.get(item[0]["priority"], 0), -item[1], item[0].get("task_name", "")
+    ))
+
+    assignment, optimal = _pack_windows(
+        [duration for _, duration in candidates],
+        [PRIORITY_WEIGHTS.get(task["priority"], 0) for task, _ in candidates],
+        [end - start for start, end in windows],
+        time_budget,
+    )
+
+    # Lay out each window's tasks back to back, highest priority first
+    by_window = [[] for _ in windows]
+    for (task, duration), window in zip(candidates, assignment):
+        if window < 0:
+            unscheduled.append(dict(task))
+        else:
+            by_window[window].append((task, duration))
+
+    entries = [
+        (block_start, _block_entry(name, block_start, block_end))
+        for block_start, block_end, name in zip(block_starts, block_ends, block_names)
+    ]
+    scheduled_minutes = weighted_minutes = 0
+    for (window_start, _), window_tasks in zip(windows, by_window):
+        start = window_start
+        for task, duration in sorted(window_tasks, key=lambda item: (
+            PRIORITY_ORDER.get(item[0]["priority"], 999), item[0].get("task_name", "")
+        )):
+            entries.append((start, dict(task, scheduled_time=format_range(start, start + duration))))
+            scheduled_minutes += duration
+            weighted_minutes += duration * PRIORITY_WEIGHTS.get(task["priority"], 0)
+            start += duration
+    entries.sort(key=lambda item: item[0])
+
+    free_minutes = sum(end - start for start, end in windows)
+    return {
+        "schedule": [entry for _, entry in entries],
+        "unscheduled": unscheduled,
+        "scheduled_hours": scheduled_minutes / 60,
+        "weighted_hours": weighted_minutes / 60,
+        "utilization": scheduled_minutes / free_minutes if free_minutes else 0.0,
+        "optimal": optimal,
+    }
+
+
+class _FreeTimeTree:
+    """
+    Segment tree over the minutes of [lo, hi) tracking the longest free run,
+    with lazy range assignment. Finding the earliest gap of a given length,
+    occupying or freeing a range are all O(log minutes).
+    """
+
+    def __init__(self, lo, hi):
+        self.lo, self.hi = lo, hi
+        size = 4 * max(hi - lo, 1)
+        self.best = [0] * size
+        self.prefix = [0] * size
+        self.suffix = [0] * size
+        self.pending = [None] * size
+        self._build(1, lo, hi)
+
+    def _build(self, node, lo, hi):
+        self.best[node] = self.prefix[node] = self.suffix[node] = hi - lo
+        if hi - lo > 1:
+            mid = (lo + hi) // 2
+            self._build(2 * node, lo, mid)
+            self._build(2 * node + 1, mid, hi)
+
+    def _fill(self, node, length, occupied):
+        free = 0 if occupied else length
+        self.best[node] = self.prefix[node] = self.suffix[node] = free
+        self.pending[node] = occupied
+
+    def _push(self, node, lo, mid, hi):
+        if self.pending[node] is not None:
+            self._fill(2 * node, mid - lo, self.pending[node])
+            self._fill(2 * node + 1, hi - mid, self.pending[node])
+            self.pending[node] = None
+
+    def _pull(self, node, lo, mid, hi):
+        left, right = 2 * node, 2 * node + 1
+        self.prefix[node] = self.prefix[left] + (self.prefix[right] if self.prefix[left] == mid - lo else 0)
+        self.suffix[node] = self.suffix[right] + (self.suffix[left] if self.suffix[right] == hi - mid else 0)
+        self.best[node] = max(self.best[left], self.best[right], self.suffix[left] + self.prefix[right])
+
+    def assign(self, start, end, occupied, node=1, lo=None, hi=None):
+        lo = self.lo if lo is None else lo
+        hi = self.hi if hi is None else hi
+        if end <= lo or hi <= start:
+            return
+        if start <= lo and hi <= end:
+            self._fill(node, hi - lo, occupied)
+            return
+        mid = (lo + hi) // 2
+        self._push(node, lo, mid, hi)
+        self.assign(start, end, occupied, 2 * node, lo, mid)
+        self.assign(start, end, occupied, 2 * node + 1, mid, hi)
+        self._pull(node, lo, mid, hi)
+
+    def find_first(self, length, node=1, lo=None, hi=None):
+        """
+        Return the earliest start of `length` free minutes, or -1.
+        """
+        lo = self.lo if lo is None else lo
+        hi = self.hi if hi is None else hi
+        if self.best[node] < length:
+            return -1
+        if self.prefix[node] >= length:
+            return lo
+        mid = (lo + hi) // 2
+        self._push(node, lo, mid, hi)
+        if self.best[2 * node] >= length:
+            return self.find_first(length, 2 * node, lo, mid)
+        if self.suffix[2 * node] + self.prefix[2 * node + 1] >= length:
+            return mid - self.suffix[2 * node]
+        return self.find_first(length, 2 * node + 1, mid, hi)
+
+    def is_free(self, start, end, node=1, lo=None, hi=None):
+        lo = self.lo if lo is None else lo
+        hi = self.hi if hi is None else hi
+        if end <= lo or hi <= start or self.best[node] == hi - lo:
+            return True
+        if self.best[node] == 0:
+            return False
+        mid = (lo + hi) // 2
+        self._push(node, lo, mid, hi)
+        return (self.is_free(start, end, 2 * node, lo, mid)
+                and self.is_free(start, end, 2 * node + 1, mid, hi))
+
+
+class IncrementalSchedule:
+    """
+    One day's schedule updated a task at a time instead of rebuilt from scratch.
+
+    Occupied time is kept in an interval index, so inserting, removing or moving
+    a task costs O(log minutes) and other tasks keep their slots. Each update
+    returns only the assignments it changed as {task_id: "HH:MM-HH:MM" or None}.
+    Tasks that do not fit wait, by priority, for room freed by later updates.
+    Callers' task dicts are copied, never mutated.
+    """
+
+    def __init__(self, task_date=None, blocks=None):
+        self.task_date = task_date
+        self._blocks = MEAL_TIMELINE if blocks is None else build_timeline(blocks)
+        self._free = _FreeTimeTree(DAY_START, DAY_END)
+        for block_start, block_end in zip(self._blocks[0], self._blocks[1]):
+            self._free.assign(block_start, block_end, True)
+        self._tasks = {}
+        self._slots = {}
+        self._waiting = {}
+
+    def _place(self, task_id, start):
+        end = start + duration_minutes(self._tasks[task_id]["estimated_time"])
+        self._free.assign(start, end, True)
+        self._slots[task_id] = (start, end)
+        self._waiting.pop(task_id, None)
+        return format_range(start, end)
+
+    def _try_place(self, task_id):
+        duration = duration_minutes(self._tasks[task_id]["estimated_time"])
+        start = self._free.find_first(duration) if duration > 0 else -1
+        if start < 0:
+            task = self._tasks[task_id]
+            self._waiting[task_id] = (PRIORITY_ORDER.get(task["priority"], 999), task.get("task_name", ""))
+            return None
+        return self._place(task_id, start)
+
+    def _release(self, task_id):
+        if task_id in self._slots:
+            start, end = self._slots.pop(task_id)
+            self._free.assign(start, end, False)
+        self._waiting.pop(task_id, None)
+
+    def _fill_waiting(self, changes):
+        for task_id in sorted(self._waiting, key=self._waiting.get):
+            scheduled_time = self._try_place(task_id)
+            if scheduled_time is not None:
+                changes[task_id] = scheduled_time
+        return changes
+
+    def insert(self, task_id, task):
+        """
+        Add a task in the earliest free gap that fits it.
+        """
+        if task_id in self._tasks:
+            raise KeyError(f"Task {task_id!r} is already scheduled")
+        self._tasks[task_id] = dict(task)
+        return {task_id: self._try_place(task_id)}
+
+    def remove(self, task_id):
+        """
+        Remove a task and let waiting tasks take the freed time.
+        """
+        self._release(task_id)
+        del self._tasks[task_id]
+        return self._fill_waiting({task_id: None})
+
+    def move(self, task_id, start=None):
+        """
+        Move a task to `start` ("HH:MM" or minutes), or to the earliest gap that fits.
+        Raises ValueError, leaving the task where it was, if `start` is not free or
+        the task would not fit inside the scheduling day.
+        """
+        previous = self._slots.get(task_id)
+        self._release(task_id)
+        if start is None:
+            changes = {task_id: self._try_place(task_id)}
+        else:
+            start = to_minutes(start) if isinstance(start, str) else start
+            end = start + duration_minutes(self._tasks[task_id]["estimated_time"])
+            if start < DAY_START or end > DAY_END:
+                # Checked before formatting, since clock labels only cover a single day
+                message = (f"minutes {start}-{end} after midnight fall outside the scheduling day "
+                           f"{format_range(DAY_START, DAY_END)}")
+            elif not self._free.is_free(start, end):
+                message = f"{format_range(start, end)} is not free"
+            else:
+                message = None
+            if message is not None:
+                if previous is not None:
+                    self._place(task_id, previous[0])
+                else:
+                    self._try_place(task_id)
+                raise ValueError(message)
+            changes = {task_id: self._place(task_id, start)}
+        if previous is not None and self._slots.get(task_id) == previous:
+            return {}
+        return self._fill_waiting(changes)
+
+    def assignments(self):
+        return {task_id: format_range(start, end) for task_id, (start, end) in self._slots.items()}
+
+    def waiting(self):
+        return [dict(self._tasks[task_id]) for task_id in sorted(self._waiting, key=self._waiting.get)]
+
+    def schedule(self):
+        """
+        Return the day's entries, fixed blocks included, in time order.
+        """
+        entries = [
+            (block_start, _block_entry(name, block_start, block_end))
+            for block_start, block_end, name in zip(*self._blocks)
+        ]
+        entries.extend(
+            (start, dict(self._tasks[task_id], scheduled_time=format_range(start, end)))
+            for task_id, (start, end) in self._slots.items()
+        )
+        entries.sort(key=lambda item: item[0])
+        return [entry for _, entry in entries]
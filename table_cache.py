@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+# Seconds a cached table read stays fresh
+DEFAULT_TTL = float(os.getenv("TABLE_CACHE_TTL", "60"))
+
+# (table_id, key) -> (expires_at, value)
+_entries = {}
+# (table_id, key) -> _Call for loads that are currently running
+_inflight = {}
+# table_id -> generation, bumped on every invalidation
+_generations = {}
+_lock = threading.Lock()
+
+
+class _Call:
+    """A single in-flight load that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# Function to read through the cache, loading at most once per key at a time
+def get_or_load(table_id, key, loader, ttl=DEFAULT_TTL):
+    """
+    Return the cached value for (table_id, key), calling `loader` on a miss.
+
+    The cache is shared by every session in the process, so cached values must
+    be treated as read-only. Concurrent misses on the same key wait for a single
+    load instead of issuing their own request. Errors are re-raised to every
+    waiter and are never cached.
+    """
+    cache_key = (table_id, key)
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        call = _inflight.get(cache_key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _inflight[cache_key] = call
+            generation = _generations.get(table_id, 0)
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    try:
+        call.value = loader()
+    except BaseException as err:
+        call.error = err
+        raise
+    finally:
+        with _lock:
+            # Skip storing a result that an invalidation made stale mid-load
+            if call.error is None and _generations.get(table_id, 0) == generation:
+                _entries[cache_key] = (time.monotonic() + ttl, call.value)
+            _inflight.pop(cache_key, None)
+        call.done.set()
+    return call.value
+
+
+# Function to drop every cached read of a table after a write
+def invalidate(table_id):
+    with _lock:
+        _generations[table_id] = _generations.get(table_id, 0) + 1
+        for cache_key in [cache_key for cache_key in _entries if cache_key[0] == table_id]:
+            del _entries[cache_key]
+
@@ -0,0 +1,95 @@
+import csv
+import datetime
+import io
+import json
+
+# Columns every imported task must provide
+TASK_COLUMNS = ("task_name", "priority", "estimated_time", "task_date")
+VALID_PRIORITIES = {"High", "Medium", "Low", "Meal"}
+
+
+# Function to validate one imported record and convert it to a task row
+def parse_task_record(record):
+    """
+    Return a task row ready for the task table. Raises ValueError if the record is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with task fields")
+    missing = [column for column in TASK_COLUMNS if str(record.get(column) or "").strip() == ""]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    priority = str(record["priority"]).strip().capitalize()
+    if priority not in VALID_PRIORITIES:
+        raise ValueError(f"unknown priority '{record['priority']}'")
+
+    try:
+        estimated_time = float(record["estimated_time"])
+    except (TypeError, ValueError):
+        raise ValueError(f"estimated_time '{record['estimated_time']}' is not a number")
+    if estimated_time <= 0:
+        raise ValueError("estimated_time must be positive")
+
+    try:
+        task_date = datetime.date.fromisoformat(str(record["task_date"]).strip())
+    except ValueError:
+        raise ValueError(f"task_date '{record['task_date']}' is not YYYY-MM-DD")
+
+    return {
+        "task_name": str(record["task_name"]).strip(),
+        "priority": priority,
+        "estimated_time": int(estimated_time) if estimated_time.is_integer() else estimated_time,
+        "task_date": str(task_date)
+    }
+
+
+# Function to read records from an uploaded CSV or JSON file, or any text stream
+def iter_task_records(file_name, data, file_format=None):
+    """
+    Yield (line, record) pairs from CSV, JSON array or JSON Lines content.
+
+    `data` is bytes, text or a text stream; streams are read a line at a time,
+    except for a JSON array, which is loaded whole. `file_format` ("csv" or
+    "json") defaults to what the file name suggests.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    lines = io.StringIO(data) if isinstance(data, str) else data
+    if file_format is None:
+        file_format = "csv" if file_name.lower().endswith(".csv") else "json"
+
+    if file_format == "csv":
+        # Header is line 1, so the first record is line 2
+        yield from enumerate(csv.DictReader(lines), start=2)
+        return
+    first_record = True
+    for line, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        if first_record and raw.lstrip().startswith("["):
+            yield from enumerate(json.loads(raw + lines.read()), start=1)
+            return
+        first_record = False
+        try:
+            yield line, json.loads(raw)
+        except ValueError:
+            # Let the record check report the bad line instead of failing the file
+            yield line, raw
+
+
+# Function to parse an uploaded task file
+def parse_task_file(file_name, data):
+    """
+    Parse a CSV/JSON task file into valid task rows and per-line errors.
+    Returns (rows, errors) where errors is a list of (line, message).
+    """
+    rows, errors = [], []
+    try:
+        for line, record in iter_task_records(file_name, data):
+            try:
+                rows.append(parse_task_record(record))
+            except ValueError as err:
+                errors.append((line, str(err)))
+    except (ValueError, UnicodeDecodeError) as err:
+        errors.append((None, f"could not read file: {err}"))
+    return rows, errors
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+import jamai_client
+
+# Local SQLite mirror of the task table; disabled unless a path is set
+TASK_MIRROR_PATH = os.getenv("TASK_MIRROR_PATH")
+# Seconds between delta syncs triggered by reads
+SYNC_INTERVAL = float(os.getenv("TASK_MIRROR_SYNC_INTERVAL", "30"))
+# Above this many changed rows, re-walk the table instead of fetching rows one by one
+ROW_FETCH_LIMIT = int(os.getenv("TASK_MIRROR_ROW_FETCH_LIMIT", "50"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    task_date TEXT,
+    priority TEXT,
+    updated_at TEXT,
+    row_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_task_date ON tasks (task_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+"""
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+
+def _cell(row, column):
+    value = row.get(column)
+    return value.get("value") if isinstance(value, dict) else value
+
+
+class TaskMirror:
+    """
+    Local SQLite copy of a JamAI action table, indexed on task_date and priority.
+
+    Reads are served from SQLite. A delta sync first lists only row IDs and
+    update times, then downloads just the rows that changed and drops rows
+    deleted remotely. Once the mirror has been filled, syncs run in the
+    background so reads never wait on JamAI, and a failed sync keeps serving
+    the last good copy.
+    """
+
+    def __init__(self, path, table_id):
+        self.path = path
+        self.table_id = table_id
+        self.last_sync = 0.0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._sync_requested = False
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+            self._synced_once = self._connection.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is not None
+
+    def rows(self, task_date=None, priority=None):
+        """
+        Return raw task rows, optionally filtered by date and priority, syncing first if due.
+        """
+        self.ensure_fresh()
+        query, params = "SELECT row_json FROM tasks", []
+        conditions = []
+        if task_date is not None:
+            conditions.append("task_date = ?")
+            params.append(str(task_date))
+        if priority is not None:
+            conditions.append("priority = ?")
+            params.append(priority)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return [json.loads(row_json) for (row_json,) in self._connection.execute(query + " ORDER BY id", params)]
+
+    def ensure_fresh(self):
+        """
+        Sync inline the first time, then in a background thread whenever the interval has passed.
+        """
+        if not self._synced_once:
+            self.sync()
+        elif time.monotonic() - self.last_sync >= SYNC_INTERVAL and not self._sync_lock.locked():
+            threading.Thread(target=self._background_sync, daemon=True).start()
+
+    def sync_soon(self):
+        """
+        Sync in a background thread without waiting; if a sync is already running, it runs once more after it.
+        """
+        self._sync_requested = True
+        if not self._sync_lock.locked():
+            threading.Thread(target=self._background_sync, daemon=True).start()
+
+    def _background_sync(self):
+        # Another sync already running makes this one redundant, unless a pass was requested after it listed the rows
+        while self._sync_lock.acquire(blocking=False):
+            try:
+                self._sync_requested = False
+                self._sync_locked()
+            except requests.RequestException:
+                # Recorded in last_error; readers keep the last good copy
+                pass
+            finally:
+                self._sync_lock.release()
+            if not self._sync_requested:
+                return
+
+    def sync(self):
+        """
+        Apply remote changes since the last sync. Returns (upserted, deleted) row counts.
+        """
+        with self._sync_lock:
+            return self._sync_locked()
+
+    def _sync_locked(self):
+        try:
+            upserted, deleted = self._sync()
+        except requests.RequestException as err:
+            self.last_error = err
+            self.last_sync = time.monotonic()
+            raise
+        self.last_error = None
+        self.last_sync = time.monotonic()
+        self._synced_once = True
+        return upserted, deleted
+
+    def _sync(self):
+        # Listing pass: IDs and update times only
+        remote = {
+            row["ID"]: row.get("Updated at")
+            for row in jamai_client.iter_rows("action", self.table_id, columns=["task_date"])
+        }
+        with self._lock:
+            local = dict(self._connection.execute("SELECT id, updated_at FROM tasks"))
+        changed = {row_id for row_id, updated_at in remote.items() if local.get(row_id) != updated_at}
+        deleted = [row_id for row_id in local if row_id not in remote]
+
+        if len(changed) > ROW_FETCH_LIMIT:
+            fresh_rows = [row for row in jamai_client.iter_rows("action", self.table_id) if row["ID"] in changed]
+        else:
+            fresh_rows = []
+            for row_id in changed:
+                response = jamai_client.get(f"gen_tables/action/{self.table_id}/rows/{row_id}")
+                if response.status_code == 404:
+                    # Deleted between the listing and this fetch
+                    deleted.append(row_id)
+                    continue
+                response.raise_for_status()
+                fresh_rows.append(response.json())
+
+        self.upsert_rows(fresh_rows)
+        self.delete_rows(deleted)
+        return len(fresh_rows), len(deleted)
+
+    def upsert_rows(self, rows):
+        records = [
+            (row["ID"], _cell(row, "task_date"), _cell(row, "priority"), row.get("Updated at"), json.dumps(row))
+            for row in rows
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tasks (id, task_date, priority, updated_at, row_json) VALUES (?, ?, ?, ?, ?)",
+                records,
+            )
+
+    def delete_rows(self, row_ids):
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM tasks WHERE id = ?", [(row_id,) for row_id in row_ids])
+
+
+# Function to get the shared mirror of the task table, or None when mirroring is off
+def get_mirror(table_id):
+    if not TASK_MIRROR_PATH:
+        return None
+    with _mirrors_lock:
+        if table_id not in _mirrors:
+            _mirrors[table_id] = TaskMirror(TASK_MIRROR_PATH, table_id)
+        return _mirrors[table_id]
+
+
+# Function to pick up a write in the background, so the page never waits on JamAI for it
+def sync_soon(table_id):
+    mirror = get_mirror(table_id)
+    if mirror is not None:
+        mirror.sync_soon()
+
+
+# Function to sync the mirror right away for an explicit refresh, if mirroring is on
+def sync_now(table_id):
+    mirror = get_mirror(table_id)
+    if mirror is None:
+        return
+    try:
+        mirror.sync()
+    except requests.RequestException:
+        # The mirror keeps its last copy and the next read retries
+        pass